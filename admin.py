@@ -0,0 +1,68 @@
+import hmac
+from functools import wraps
+from flask import Blueprint, abort, current_app, jsonify, request, send_from_directory
+from logging_setup import set_levels, get_levels, get_sampling_filter
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+def admin_required(view):
+    """
+    Require the X-Admin-Token header to match the ADMIN_TOKEN config
+
+    Admin endpoints answer 404 when no token is configured.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not is_admin_request():
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapped
+
+def is_admin_request():
+    """Check whether the current request carries a valid admin token"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+@bp.route('/logging', methods=['GET', 'POST'])
+@admin_required
+def logging_config():
+    """
+    Show or change log levels and sampling rates without a restart
+
+    POST body: {"levels": {"weather.cache": "DEBUG"}, "sample_rates": {"cache.hit": 10}}
+    """
+    sampling = get_sampling_filter()
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        try:
+            rates = {event: max(int(rate), 1) for event, rate in (body.get('sample_rates') or {}).items()}
+        except (ValueError, TypeError, AttributeError) as e:
+            return jsonify({'error': f"Invalid sample rate: {e}"}), 400
+        try:
+            set_levels(body.get('levels') or {})
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        if sampling is not None:
+            sampling.rates.update(rates)
+
+    return jsonify({
+        'levels': get_levels(),
+        'sample_rates': dict(sampling.rates) if sampling is not None else {}
+    })
+
+@bp.route('/profiles')
+@admin_required
+def profiles():
+    """List the slowest recently profiled requests (?limit=N)"""
+    from profiling import slowest_profiles
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify(slowest_profiles(limit))
+
+@bp.route('/profiles/<profile_id>.prof')
+@admin_required
+def profile_dump(profile_id):
+    """Download the cProfile dump of one profiled request"""
+    if not profile_id.isalnum():
+        abort(404)
+    return send_from_directory(current_app.config['PROFILE_DIR'], f"{profile_id}.prof")
@@ -0,0 +1,196 @@
+import os
+import io
+import gzip
+import json
+import shutil
+import hashlib
+import logging
+import mimetypes
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+
+try:
+    import brotli
+except ImportError:  # build-assets refuses to run without it
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # build-assets refuses to run without it
+    Image = None
+
+logger = logging.getLogger('weather.assets')
+
+# Build output, inside the static folder
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+
+# Extensions worth precompressing (images such as PNG are already compressed)
+COMPRESSIBLE = ('.js', '.css', '.svg', '.json', '.txt', '.html')
+
+# Source and manifest name of the app icon, and its size in pixels
+ICON_SOURCE = 'generated-icon.png'
+ICON_NAME = 'images/icon.png'
+ICON_SIZE = 192
+
+# Fingerprinted names never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def fingerprint(name, content):
+    """
+    Insert a content hash into a file name
+
+    Args:
+        name (str): Path relative to the static folder, e.g. 'js/weather.js'
+        content (bytes): File content
+
+    Returns:
+        str: e.g. 'js/weather.3f2a9c0d1b7e.js'
+    """
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def optimize_icon(content, size=ICON_SIZE):
+    """Downscale and recompress the app icon (None without Pillow)"""
+    if Image is None:
+        logger.warning("Pillow not installed; skipping %s", ICON_NAME)
+        return None
+    image = Image.open(io.BytesIO(content))
+    image.thumbnail((size, size), Image.LANCZOS)
+    out = io.BytesIO()
+    image.save(out, 'PNG', optimize=True)
+    return out.getvalue()
+
+
+def _write(dist, name, content):
+    """Write one fingerprinted asset plus any smaller compressed variants"""
+    path = os.path.join(dist, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+    if not name.endswith(COMPRESSIBLE):
+        return
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+
+
+def build_assets(static_folder, icon_path=None):
+    """
+    Build fingerprinted, precompressed copies of the static files
+
+    Everything under `static_folder` is copied to `static_folder/dist` with
+    a content hash in its name, plus .gz (and .br with brotli installed)
+    variants for text assets. The app icon is downscaled to ICON_SIZE
+    (with Pillow installed; otherwise no icon is built). A
+    manifest maps each original name to its built name.
+
+    Args:
+        static_folder (str): App static folder
+        icon_path (str): App icon to optimize (skipped when None or missing)
+
+    Returns:
+        dict: Original name -> fingerprinted name
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder and DIST_DIR in dirs:
+            dirs.remove(DIST_DIR)
+        for filename in sorted(files):
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                content = f.read()
+            manifest[name] = fingerprint(name, content)
+            _write(dist, manifest[name], content)
+
+    if icon_path and os.path.exists(icon_path):
+        with open(icon_path, 'rb') as f:
+            content = optimize_icon(f.read())
+        # The source is far too large to serve as is; only link an optimized icon
+        if content is not None:
+            manifest[ICON_NAME] = fingerprint(ICON_NAME, content)
+            _write(dist, manifest[ICON_NAME], content)
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    """Read the build manifest, or {} if assets have not been built"""
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(name):
+    """
+    URL for a static file: the fingerprinted build when there is one,
+    otherwise the plain static URL
+
+    Args:
+        name (str): Path relative to the static folder, e.g. 'css/custom.css'
+    """
+    built = current_app.extensions['asset_manifest'].get(name)
+    if built:
+        return url_for('assets', filename=built)
+    return url_for('static', filename=name)
+
+
+def serve_asset(filename):
+    """Serve a fingerprinted asset, precompressed when the client accepts it"""
+    directory = os.path.join(current_app.static_folder, DIST_DIR)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for suffix, name in (('.br', 'br'), ('.gz', 'gzip')):
+        if request.accept_encodings[name] > 0 and os.path.isfile(os.path.join(directory, filename + suffix)):
+            encoding = name
+            filename += suffix
+            break
+
+    response = send_from_directory(directory, filename, mimetype=mimetype, max_age=31536000)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+
+def init_assets(app):
+    """
+    Add asset_url() to templates and serve built assets under /assets/
+
+    The manifest is read once here; run `flask build-assets` before starting
+    the server to pick up changed files.
+    """
+    app.extensions['asset_manifest'] = load_manifest(app.static_folder)
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.jinja_env.globals['asset_manifest'] = app.extensions['asset_manifest']
+
+
+@click.command('build-assets')
+@with_appcontext
+def build_assets_command():
+    """Fingerprint and precompress static files into static/dist"""
+    # Without these a deploy would quietly ship no .br files and no icon
+    missing = [name for name, module in (('brotli', brotli), ('Pillow', Image)) if module is None]
+    if missing:
+        raise click.ClickException(f"{' and '.join(missing)} not installed; run `uv sync` first")
+    icon_path = os.path.join(current_app.root_path, ICON_SOURCE)
+    manifest = build_assets(current_app.static_folder, icon_path)
+    click.echo(f"Built {len(manifest)} assets into {os.path.join(current_app.static_folder, DIST_DIR)}")
@@ -35,6 +35,16 @@ def main(page: ft.Page):
         )
     )
 
+    units_dropdown = ft.Dropdown(
+        label="Units",
+        width=140,
+        value="metric",
+        options=[
+            ft.dropdown.Option("metric", "Metric (°C)"),
+            ft.dropdown.Option("imperial", "Imperial (°F)")
+        ]
+    )
+
     error_text = ft.Text(
         color="red",
         size=14,
@@ -52,6 +62,8 @@ def main(page: ft.Page):
         error_text.visible = False
         weather_card.visible = True
         
+        labels = weather_data["labels"]
+
         # Create weather icon URL
         icon_code = weather_data["icon"]
         icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
@@ -82,7 +94,7 @@ def main(page: ft.Page):
                     alignment=ft.MainAxisAlignment.CENTER,
                     controls=[
                         ft.Text(
-                            f"{weather_data['temperature']}°C",
+                            f"{weather_data['temperature']}{labels['temperature']}",
                             size=48,
                             weight=ft.FontWeight.BOLD
                         )
@@ -104,7 +116,7 @@ def main(page: ft.Page):
                         ft.Column(
                             controls=[
                                 ft.Text("Feels Like", size=16),
-                                ft.Text(f"{weather_data['feels_like']}°C", size=20, weight=ft.FontWeight.BOLD)
+                                ft.Text(f"{weather_data['feels_like']}{labels['temperature']}", size=20, weight=ft.FontWeight.BOLD)
                             ]
                         ),
                         ft.Column(
@@ -116,7 +128,7 @@ def main(page: ft.Page):
                         ft.Column(
                             controls=[
                                 ft.Text("Wind Speed", size=16),
-                                ft.Text(f"{weather_data['wind_speed']} m/s", size=20, weight=ft.FontWeight.BOLD)
+                                ft.Text(f"{weather_data['wind_speed']} {labels['wind_speed']}", size=20, weight=ft.FontWeight.BOLD)
                             ]
                         )
                     ]
@@ -133,9 +145,16 @@ def main(page: ft.Page):
             page.update()
             return
 
-        weather_data = weather_service.get_weather(city_input.value)
+        weather_data = weather_service.get_weather(city_input.value, units_dropdown.value)
         create_weather_content(weather_data)
 
+    def change_units(e):
+        # Re-fetch the shown city in the new units
+        if city_input.value and weather_card.visible:
+            search_weather(e)
+
+    units_dropdown.on_change = change_units
+
     search_btn = ft.ElevatedButton(
         "Search",
         on_click=search_weather,
@@ -156,6 +175,7 @@ def main(page: ft.Page):
                     alignment=ft.MainAxisAlignment.CENTER,
                     controls=[city_input, search_btn]
                 ),
+                units_dropdown,
                 error_text,
                 weather_card
             ]
@@ -1,37 +1,77 @@
 import os
+import sys
 import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Share the web app's weather core (pooled client, cache, unit handling)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# The dashboard's .env used a different name for the same key
+if os.getenv("OPENWEATHERMAP_API_KEY"):
+    os.environ.setdefault("OPENWEATHER_API_KEY", os.environ["OPENWEATHERMAP_API_KEY"])
+
+UNIT_LABELS = {
+    "metric": {"temperature": "°C", "wind_speed": "m/s"},
+    "imperial": {"temperature": "°F", "wind_speed": "mph"}
+}
+
 class WeatherService:
-    def __init__(self):
-        self.api_key = os.getenv("OPENWEATHERMAP_API_KEY")
-        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
-        
-    def get_weather(self, city):
+    """
+    Weather lookups for the dashboard
+
+    By default this calls the same weather_api module as the web app, in
+    process. With a server URL (or WEATHER_SERVER_URL) it reads the Flask
+    /api/weather endpoint instead, so every client shares the server cache
+    and API quota.
+    """
+
+    def __init__(self, server_url=None, timeout=10):
+        self.server_url = (server_url or os.getenv("WEATHER_SERVER_URL") or "").rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session() if self.server_url else None
+
+    def get_weather(self, city, units="metric"):
+        if units not in UNIT_LABELS:
+            units = "metric"
         try:
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": "metric"  # For Celsius
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "city": data["name"],
-                "country": data["sys"]["country"],
-                "temperature": round(data["main"]["temp"]),
-                "humidity": data["main"]["humidity"],
-                "description": data["weather"][0]["description"],
-                "icon": data["weather"][0]["icon"],
-                "feels_like": round(data["main"]["feels_like"]),
-                "wind_speed": data["wind"]["speed"]
-            }
-        except requests.RequestException as e:
+            if self.server_url:
+                data = self._fetch_remote(city, units)
+            else:
+                from weather_api import get_current_weather
+                data = get_current_weather(city, units)
+        except requests.RequestException:
             return {"error": "Failed to fetch weather data. Please try again."}
-        except (KeyError, ValueError) as e:
-            return {"error": "Invalid city name. Please try again."} 
\ No newline at end of file
+        except ValueError:
+            return {"error": "Invalid response from weather server. Please try again."}
+
+        if not data or "error" in data:
+            return {"error": (data or {}).get("error", "Failed to fetch weather data. Please try again.")}
+
+        return {
+            "city": data["location"],
+            "country": data["country"],
+            "temperature": data["temperature"],
+            "humidity": data["humidity"],
+            "description": data["description"],
+            "icon": data["icon"],
+            "feels_like": data["feels_like"],
+            "wind_speed": data["wind_speed"],
+            "units": units,
+            "labels": UNIT_LABELS[units]
+        }
+
+    def _fetch_remote(self, city, units):
+        response = self.session.get(
+            f"{self.server_url}/api/weather",
+            params={"location": city, "units": units},
+            timeout=self.timeout
+        )
+        body = response.json()
+        if "error" in body:
+            return body
+        response.raise_for_status()
+        return body["current_weather"]
@@ -0,0 +1,105 @@
+import time
+import logging
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import or_, update
+from database import db
+from models import FavoriteLocation
+from cache import get_cached_data
+from weather_api import get_coordinates
+
+logger = logging.getLogger('weather.backfill')
+
+# OpenWeatherMap's free tier allows 60 calls a minute
+DEFAULT_RATE = 1.0
+
+# Location names resolved per UPDATE transaction
+DEFAULT_BATCH_SIZE = 100
+
+
+def missing_coordinate_names():
+    """Distinct favorite names (across all users) lacking latitude or longitude"""
+    rows = db.session.query(FavoriteLocation.location_name).filter(
+        or_(FavoriteLocation.latitude.is_(None), FavoriteLocation.longitude.is_(None))
+    ).distinct().all()
+    return [name for (name,) in rows]
+
+
+def _apply(resolved):
+    """Write one batch of name -> (lat, lon) to every matching favorite"""
+    updated = 0
+    for name, (lat, lon) in resolved.items():
+        result = db.session.execute(
+            update(FavoriteLocation)
+            .where(FavoriteLocation.location_name == name)
+            .where(or_(FavoriteLocation.latitude.is_(None), FavoriteLocation.longitude.is_(None)))
+            .values(latitude=lat, longitude=lon)
+        )
+        updated += result.rowcount
+    db.session.commit()
+    return updated
+
+
+def backfill_coordinates(rate=DEFAULT_RATE, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Geocode favorites that were saved without coordinates
+
+    Each distinct name is geocoded once however many users saved it, with
+    geocoding calls spaced to at most `rate` per second (cached names cost
+    nothing). Rows are updated in bulk, one transaction per batch.
+
+    Args:
+        rate (float): Maximum geocoding calls per second
+        batch_size (int): Names resolved per transaction
+        dry_run (bool): Resolve names but do not write
+
+    Returns:
+        dict: Counts of names, updated rows and the names that did not resolve
+    """
+    names = missing_coordinate_names()
+    interval = 1.0 / rate if rate > 0 else 0
+    next_call = 0.0
+    resolved = {}
+    unresolved = []
+    updated = 0
+
+    for name in names:
+        coords = get_cached_data(f"coordinates_{name}")
+        if coords is None:
+            # Space out the calls that will actually reach the geocoding API
+            delay = next_call - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_call = time.monotonic() + interval
+            coords = get_coordinates(name)
+
+        if coords:
+            resolved[name] = coords
+        else:
+            unresolved.append(name)
+
+        if len(resolved) >= batch_size:
+            updated += 0 if dry_run else _apply(resolved)
+            resolved = {}
+
+    if resolved and not dry_run:
+        updated += _apply(resolved)
+
+    logger.info("Backfilled coordinates for %d favorites (%d names, %d unresolved)",
+                updated, len(names), len(unresolved))
+    return {'names': len(names), 'updated': updated, 'unresolved': unresolved}
+
+
+@click.command('backfill-coordinates')
+@click.option('--rate', type=float, default=DEFAULT_RATE, show_default=True,
+              help='Maximum geocoding calls per second')
+@click.option('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Names resolved per transaction')
+@click.option('--dry-run', is_flag=True, help='Resolve names without writing')
+@with_appcontext
+def backfill_coordinates_command(rate, batch_size, dry_run):
+    """Fill in missing coordinates on favorite locations"""
+    result = backfill_coordinates(rate=rate, batch_size=batch_size, dry_run=dry_run)
+    click.echo(f"{result['names']} names to resolve, {result['updated']} favorites updated")
+    for name in result['unresolved']:
+        click.echo(f"Could not resolve: {name}")
@@ -0,0 +1,111 @@
+"""
+Memory benchmark for cached weather payloads.
+
+Fills the cache with current weather + 5-day forecast (with its 40 raw
+3-hour slots) + coordinates for N synthetic cities, once using a dict
+layout and once using the slotted record types, and reports the traced
+allocation size of each.
+
+Usage:
+    python benchmarks/cache_memory.py [--cities 100000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import Coordinates, CurrentWeather, DailyForecast, Forecast, ForecastSeries  # noqa: E402
+
+DESCRIPTIONS = ['clear sky', 'few clouds', 'scattered clouds', 'light rain', 'snow']
+ICONS = ['01d', '02d', '03d', '10d', '13d']
+DATES = ['2025-05-21', '2025-05-22', '2025-05-23', '2025-05-24', '2025-05-25']
+
+
+def _raw_current(i):
+    return {
+        'name': f"City {i}",
+        'sys': {'country': 'US', 'sunrise': 1747800000 + i, 'sunset': 1747850000 + i},
+        'main': {'temp': 20.5 + i % 10, 'feels_like': 19.5, 'humidity': 40 + i % 50, 'pressure': 1013},
+        'wind': {'speed': 3.6, 'deg': i % 360},
+        'weather': [{'description': DESCRIPTIONS[i % 5], 'icon': ICONS[i % 5], 'main': 'Clouds'}],
+        'dt': 1747830000 + i,
+        'coord': {'lat': 40.0 + i * 1e-4, 'lon': -74.0 - i * 1e-4},
+    }
+
+
+def _raw_slots(i):
+    return [
+        {'dt': 1747830000 + k * 10800, 'main': {'temp': 20.0 + k % 7 + i % 3, 'feels_like': 19.0 + k % 5, 'humidity': 40 + k}}
+        for k in range(40)
+    ]
+
+
+def fill_legacy(n):
+    cache = {}
+    for i in range(n):
+        current = CurrentWeather.from_api(_raw_current(i), f"City {i}", 'metric').to_dict()
+        forecast = {
+            'days': [
+                {'date': DATES[d], 'avg_temp': 20 + d, 'icon': ICONS[d], 'description': DESCRIPTIONS[d], 'units': 'metric'}
+                for d in range(5)
+            ],
+            'slots': [
+                {'dt': slot['dt'], 'temp': slot['main']['temp'], 'feels_like': slot['main']['feels_like'],
+                 'humidity': slot['main']['humidity']}
+                for slot in _raw_slots(i)
+            ]
+        }
+        coords = (current['latitude'], current['longitude'])
+        cache[f"current_weather_City {i}_metric"] = {'data': current, 'expiry': 1747831800.0 + i}
+        cache[f"forecast_City {i}_metric"] = {'data': forecast, 'expiry': 1747833600.0 + i}
+        cache[f"coordinates_City {i}"] = {'data': coords, 'expiry': 1747916400.0 + i}
+    return cache
+
+
+def fill_records(n):
+    from cache import CacheEntry
+
+    cache = {}
+    for i in range(n):
+        current = CurrentWeather.from_api(_raw_current(i), f"City {i}", 'metric')
+        forecast = Forecast(
+            tuple(DailyForecast(DATES[d], 20 + d, ICONS[d], DESCRIPTIONS[d], 'metric') for d in range(5)),
+            ForecastSeries.from_api(_raw_slots(i))
+        )
+        coords = Coordinates(current.latitude, current.longitude)
+        cache[f"current_weather_City {i}_metric"] = CacheEntry(current, 1747831800.0 + i)
+        cache[f"forecast_City {i}_metric"] = CacheEntry(forecast, 1747833600.0 + i)
+        cache[f"coordinates_City {i}"] = CacheEntry(coords, 1747916400.0 + i)
+    return cache
+
+
+def measure(fill, n):
+    gc.collect()
+    tracemalloc.start()
+    cache = fill(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type=int, default=100_000)
+    args = parser.parse_args()
+
+    legacy = measure(fill_legacy, args.cities)
+    records = measure(fill_records, args.cities)
+
+    print(f"cities:        {args.cities}")
+    print(f"legacy dicts:  {legacy / 2**20:8.1f} MiB  ({legacy / args.cities:6.0f} B/city)")
+    print(f"slotted:       {records / 2**20:8.1f} MiB  ({records / args.cities:6.0f} B/city)")
+    print(f"saving:        {100 * (1 - records / legacy):8.1f} %")
+
+
+if __name__ == '__main__':
+    main()
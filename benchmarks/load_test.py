@@ -0,0 +1,157 @@
+"""
+Offline load test against a replayed upstream.
+
+Serves /api/weather from a ReplayProvider archive (recorded with
+WEATHER_PROVIDER=record, or synthesized with --synthetic N) and drives it
+with concurrent clients through the Flask test client. Nothing touches the
+network.
+
+Usage:
+    python benchmarks/load_test.py --archive weather_archive.jsonl.gz
+    python benchmarks/load_test.py --synthetic 200 --latency 0.05 --cold
+    python benchmarks/load_test.py --synthetic 200 --profile hot_path.prof
+"""
+import argparse
+import cProfile
+import gzip
+import json
+import os
+import pstats
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+import providers  # noqa: E402
+from app import create_app  # noqa: E402
+
+
+def synthesize_archive(path, cities, units=('metric', 'imperial')):
+    """Write a replay archive with plausible responses for N fake cities"""
+    rng = random.Random(42)
+    with gzip.open(path, 'wt', encoding='utf-8') as archive:
+        def write(endpoint, params, body):
+            record = {'key': providers.request_key(endpoint, params), 'endpoint': endpoint,
+                      'params': params, 'body': body}
+            archive.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+        for i in range(cities):
+            name = f"City {i}"
+            lat, lon = round(rng.uniform(-60, 60), 4), round(rng.uniform(-180, 180), 4)
+            write('geo', {'q': name, 'limit': 1}, [{'name': name, 'lat': lat, 'lon': lon, 'country': 'XX'}])
+            for unit in units:
+                params = {'lat': lat, 'lon': lon, 'units': unit}
+                write('weather', params, {
+                    'name': name, 'sys': {'country': 'XX', 'sunrise': 1747800000, 'sunset': 1747850000},
+                    'main': {'temp': rng.uniform(-5, 35), 'feels_like': rng.uniform(-5, 35),
+                             'humidity': rng.randint(10, 100), 'pressure': rng.randint(990, 1030)},
+                    'wind': {'speed': rng.uniform(0, 15), 'deg': rng.randint(0, 359)},
+                    'weather': [{'main': 'Clouds', 'description': 'scattered clouds', 'icon': '03d'}],
+                    'dt': 1747830000, 'coord': {'lat': lat, 'lon': lon},
+                })
+                write('forecast', params, {'list': [
+                    {'dt': 1747830000 + k * 10800,
+                     'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(1747830000 + k * 10800)),
+                     'main': {'temp': rng.uniform(-5, 35), 'feels_like': rng.uniform(-5, 35),
+                              'humidity': rng.randint(10, 100)},
+                     'weather': [{'main': 'Rain', 'description': 'light rain', 'icon': '10d'}]}
+                    for k in range(40)
+                ]})
+
+
+def archived_locations(responses):
+    """City names that have a recorded geocoding response"""
+    names = []
+    for key in responses:
+        if key.startswith('geo?'):
+            query = dict(part.split('=', 1) for part in key[4:].split('&'))
+            names.append(query['q'])
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--archive', help='Replay archive (default: synthesize one)')
+    parser.add_argument('--synthetic', type=int, default=100, help='Cities to synthesize without --archive')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated upstream latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+    parser.add_argument('--profile', metavar='FILE', help='Write a cProfile dump of the run')
+    args = parser.parse_args()
+
+    archive = args.archive
+    if not archive:
+        archive = os.path.join(tempfile.mkdtemp(), 'synthetic.jsonl.gz')
+        synthesize_archive(archive, args.synthetic)
+
+    replay = providers.ReplayProvider(archive, latency=args.latency, jitter=args.jitter)
+    providers.set_provider(replay)
+    locations = archived_locations(replay.responses)
+    if not locations:
+        sys.exit('Archive has no geocoding responses to drive requests with')
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    latencies = []
+    errors = []
+    profiles = []
+    lock = threading.Lock()
+    per_worker = args.requests // args.concurrency
+
+    def worker(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        profiler = cProfile.Profile() if args.profile else None
+        if profiler:
+            profiler.enable()
+        for _ in range(per_worker):
+            if args.cold:
+                cache.clear_cache()
+            location = rng.choice(locations)
+            units = rng.choice(('metric', 'imperial'))
+            start = time.perf_counter()
+            response = client.get('/api/weather', query_string={'location': location, 'units': units})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200 or 'error' in response.get_json():
+                    errors.append(response.get_json())
+        if profiler:
+            profiler.disable()
+            with lock:
+                profiles.append(profiler)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    if profiles:
+        # cProfile only sees the thread that enabled it, so merge per-worker profiles
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(args.profile)
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"requests:    {len(ms)} ({len(errors)} errors) over {len(locations)} locations")
+    print(f"throughput:  {len(ms) / wall:8.1f} req/s")
+    print(f"latency ms:  p50 {statistics.median(ms):.2f}  p95 {ms[int(len(ms) * 0.95) - 1]:.2f}  max {ms[-1]:.2f}")
+    if errors:
+        print("first error:", errors[0])
+    if args.profile:
+        print(f"profile written to {args.profile} (merged across {len(profiles)} workers)")
+
+
+if __name__ == '__main__':
+    main()
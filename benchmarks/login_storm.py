@@ -0,0 +1,100 @@
+"""
+Weather-route latency during a login storm.
+
+Emulates a server with a fixed number of request workers (like gunicorn
+threads): a shared pool of N threads serves a stream of /login POSTs mixed
+with cached /api/weather GETs. Weather latency is measured from submission
+(so it includes time spent queued behind logins) to completion.
+
+Runs twice: hashing inline in the worker (PASSWORD_HASH_WORKERS=0), then
+through the bounded process pool.
+
+Usage:
+    python benchmarks/login_storm.py [--workers 4] [--logins 200] [--weather 400]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import providers  # noqa: E402
+import security  # noqa: E402
+from app import create_app, initialize  # noqa: E402
+from database import db  # noqa: E402
+from load_test import synthesize_archive  # noqa: E402
+from models import User  # noqa: E402
+
+
+def run(hasher, args, archive):
+    security.password_hasher = hasher
+    # No throttling here: we want every login to reach the hasher
+    security.login_throttle = security.LoginThrottle(limits={})
+    import views
+    views.password_hasher = security.password_hasher
+    views.login_throttle = security.login_throttle
+
+    providers.set_provider(providers.ReplayProvider(archive))
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+    initialize(app)
+    with app.app_context():
+        user = User(username='storm', email='storm@example.com',
+                    password_hash=security.generate_password_hash('secret', hasher.method))
+        db.session.add(user)
+        db.session.commit()
+
+    # Warm the weather cache so weather requests measure only serving cost
+    app.test_client().get('/api/weather', query_string={'location': 'City 0'})
+
+    def login():
+        return app.test_client().post('/login', data={'username': 'storm', 'password': 'wrong'}).status_code
+
+    def weather(submitted):
+        app.test_client().get('/api/weather', query_string={'location': 'City 0'})
+        return time.perf_counter() - submitted
+
+    weather_futures = []
+    logins = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        ratio = max(args.weather // max(args.logins, 1), 1)
+        for i in range(max(args.logins, args.weather)):
+            if i < args.logins:
+                logins.append(pool.submit(login))
+            for _ in range(ratio if i * ratio < args.weather else 0):
+                weather_futures.append(pool.submit(weather, time.perf_counter()))
+        latencies = sorted(f.result() * 1000 for f in weather_futures)
+        rejected = sum(1 for f in logins if f.result() == 503)
+    hasher.shutdown()
+    return latencies, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='Emulated request worker threads')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--weather', type=int, default=400)
+    parser.add_argument('--hash-workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=2)
+    parser.add_argument('--method', default=security.PASSWORD_HASH_METHOD)
+    args = parser.parse_args()
+
+    archive = os.path.join(tempfile.mkdtemp(), 'storm.jsonl.gz')
+    synthesize_archive(archive, 1)
+
+    for label, hasher in (
+        ('inline', security.PasswordHasher(method=args.method, workers=0)),
+        ('process pool', security.PasswordHasher(method=args.method, workers=args.hash_workers,
+                                                 max_pending=args.max_pending)),
+    ):
+        ms, rejected = run(hasher, args, archive)
+        print(f"{label:<13} weather latency ms: p50 {statistics.median(ms):8.2f}  "
+              f"p95 {ms[int(len(ms) * 0.95) - 1]:8.2f}  max {ms[-1]:8.2f}  "
+              f"(logins shed with 503: {rejected}/{args.logins})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Startup-time benchmark.
+
+Runs each sample in a fresh interpreter and reports:
+  - import time of the app module
+  - create_app() time, with its per-phase breakdown
+  - initialize() time (the one-time pre-fork work)
+  - first-request latency for a page that needs no upstream call
+
+Usage:
+    python benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+app = app_module.create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True})
+t2 = time.perf_counter()
+init_phases = app_module.initialize(app)
+t3 = time.perf_counter()
+client = app.test_client()
+client.get('/login')
+t4 = time.perf_counter()
+client.get('/login')
+t5 = time.perf_counter()
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'initialize_ms': (t3 - t2) * 1000,
+    'first_request_ms': (t4 - t3) * 1000,
+    'second_request_ms': (t5 - t4) * 1000,
+    'phases': app.extensions['startup_phases'],
+    'init_phases': init_phases,
+}))
+"""
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    for metric in ('import_ms', 'create_app_ms', 'initialize_ms', 'first_request_ms', 'second_request_ms'):
+        values = [s[metric] for s in samples]
+        print(f"{metric:<18} median {statistics.median(values):8.2f}  min {min(values):8.2f}")
+    print("create_app phases (last run):", samples[-1]['phases'])
+    print("initialize phases (last run):", samples[-1]['init_phases'])
+
+
+if __name__ == '__main__':
+    main()
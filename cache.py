@@ -1,9 +1,31 @@
 import time
 import logging
+import threading
+from deadline import DeadlineExceeded, remaining, timeout_for
+
+logger = logging.getLogger('weather.cache')
+
+# Longest a request waits for another request loading the same key when it
+# has no deadline of its own (seconds)
+LOAD_WAIT_TIMEOUT = 30
+
+
+class CacheEntry:
+    """Slotted cache slot holding a value and its absolute expiry time"""
+    __slots__ = ('data', 'expiry')
+
+    def __init__(self, data, expiry):
+        self.data = data
+        self.expiry = expiry
+
 
 # Simple in-memory cache
 cache = {}
 
+# Keys currently being loaded -> Event set when the load finishes
+_loading = {}
+_loading_lock = threading.Lock()
+
 def cache_data(key, data, expiry_seconds):
     """
     Cache data with an expiry time
@@ -14,11 +36,10 @@ def cache_data(key, data, expiry_seconds):
         expiry_seconds (int): Seconds until expiration
     """
     expiry = time.time() + expiry_seconds
-    cache[key] = {
-        'data': data,
-        'expiry': expiry
-    }
-    logging.debug(f"Cached data with key: {key}, expires in {expiry_seconds} seconds")
+    cache[key] = CacheEntry(data, expiry)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cached data with key: %s, expires in %s seconds", key, expiry_seconds,
+                     extra={'event': 'cache.store', 'fields': {'key': key, 'ttl': expiry_seconds}})
 
 def get_cached_data(key):
     """
@@ -34,21 +55,37 @@ def get_cached_data(key):
         cache_item = cache[key]
         
         # Check if expired
-        if time.time() < cache_item['expiry']:
-            logging.debug(f"Cache hit for key: {key}")
-            return cache_item['data']
+        if time.time() < cache_item.expiry:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Cache hit for key: %s", key, extra={'event': 'cache.hit', 'fields': {'key': key}})
+            return cache_item.data
         else:
             # Remove expired item
-            logging.debug(f"Cache expired for key: {key}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Cache expired for key: %s", key, extra={'event': 'cache.expired', 'fields': {'key': key}})
             del cache[key]
     
-    logging.debug(f"Cache miss for key: {key}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cache miss for key: %s", key, extra={'event': 'cache.miss', 'fields': {'key': key}})
     return None
 
+def get_expiry(key):
+    """
+    Get the expiry time of a cached item
+    
+    Args:
+        key (str): Cache key
+        
+    Returns:
+        float: Unix time the item expires, or None if not cached
+    """
+    cache_item = cache.get(key)
+    return cache_item.expiry if cache_item else None
+
 def clear_cache():
     """Clear all cached data"""
     cache.clear()
-    logging.debug("Cache cleared")
+    logger.debug("Cache cleared", extra={'event': 'cache.clear'})
 
 def remove_expired():
     """Remove all expired items from cache"""
@@ -56,11 +93,49 @@ def remove_expired():
     keys_to_remove = []
     
     for key, cache_item in cache.items():
-        if current_time > cache_item['expiry']:
+        if current_time > cache_item.expiry:
             keys_to_remove.append(key)
     
     for key in keys_to_remove:
         del cache[key]
     
     if keys_to_remove:
-        logging.debug(f"Removed {len(keys_to_remove)} expired items from cache")
+        logger.debug("Removed %d expired items from cache", len(keys_to_remove),
+                     extra={'event': 'cache.evict', 'fields': {'count': len(keys_to_remove)}})
+
+def begin_load(key):
+    """
+    Claim the right to load a missing key, or wait for whoever has it
+    
+    Only one request fetches a missing key; concurrent requests for the same
+    key wait (bounded by their deadline) and then re-check the cache.
+    
+    Args:
+        key (str): Cache key
+        
+    Returns:
+        bool: True if the caller must load the key and then call end_load();
+            False if another load finished (or timed out) while waiting
+            
+    Raises:
+        DeadlineExceeded: If the request's budget ran out while waiting
+    """
+    with _loading_lock:
+        event = _loading.get(key)
+        if event is None:
+            _loading[key] = threading.Event()
+            return True
+    
+    logger.debug("Waiting for in-flight load of key: %s", key, extra={'event': 'cache.wait', 'fields': {'key': key}})
+    if not event.wait(timeout_for(LOAD_WAIT_TIMEOUT)):
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded waiting for {key}")
+    return False
+
+def end_load(key):
+    """Release a key claimed with begin_load() and wake any waiters"""
+    with _loading_lock:
+        event = _loading.pop(key, None)
+    if event is not None:
+        event.set()
@@ -0,0 +1,104 @@
+import time
+import threading
+from contextvars import ContextVar
+
+# Absolute time.monotonic() deadline for the work in this context (None = unbounded)
+_deadline = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the current request has no time budget left"""
+
+
+def start_deadline(seconds):
+    """
+    Give the current context a time budget
+
+    Args:
+        seconds (float): Budget from now
+
+    Returns:
+        Token to pass to clear_deadline()
+    """
+    return _deadline.set(time.monotonic() + seconds)
+
+
+def clear_deadline(token):
+    """Restore the deadline that was active before start_deadline()"""
+    _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current budget, or None if there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def timeout_for(default):
+    """
+    Timeout to use for a blocking call: the default, capped by the budget
+
+    Args:
+        default (float): Timeout to use without a deadline
+
+    Returns:
+        float: Seconds to wait
+
+    Raises:
+        DeadlineExceeded: If the budget is already spent
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    return min(default, left) if default is not None else left
+
+
+class AdmissionController:
+    """
+    Bounds the number of requests being worked on at once
+
+    A request waits at most `max_wait` seconds (or its remaining budget) for
+    a slot; if none frees up it is rejected so the caller can shed it with a
+    fast response instead of queueing.
+
+    Args:
+        max_concurrent (int): Requests allowed in flight
+        max_wait (float): Longest time to wait for a slot
+    """
+
+    def __init__(self, max_concurrent, max_wait=0.0):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self):
+        """
+        Try to admit a request
+
+        Returns:
+            bool: True if admitted (call release() when done)
+        """
+        try:
+            wait = timeout_for(self.max_wait)
+        except DeadlineExceeded:
+            wait = 0
+        admitted = self._slots.acquire(timeout=wait) if wait > 0 else self._slots.acquire(blocking=False)
+        with self._lock:
+            if admitted:
+                self.in_flight += 1
+            else:
+                self.rejected += 1
+        return admitted
+
+    def release(self):
+        """Free the slot taken by try_acquire()"""
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
@@ -0,0 +1,25 @@
+# Gunicorn picks this file up automatically from the working directory.
+
+# Threaded workers so long-lived /api/weather/stream connections do not
+# each pin a whole worker process. Each open stream still holds a thread, so
+# the thread count covers ADMISSION_MAX_CONCURRENT (12) weather requests plus
+# STREAM_MAX_CONCURRENT (12) streams, leaving threads free for everything else
+worker_class = 'gthread'
+threads = 32
+
+def on_starting(server):
+    """Run one-time startup work in the master, before any worker is forked"""
+    if server.cfg.reload:
+        # Importing the app here preloads it: workers forked by --reload would
+        # keep running the stale modules, so initialize in each worker instead
+        return
+    from main import app
+    from app import initialize
+    initialize(app)
+
+def post_worker_init(worker):
+    """With --reload (development), run the startup work in each fresh worker"""
+    if worker.cfg.reload:
+        from main import app
+        from app import initialize
+        initialize(app)
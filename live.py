@@ -0,0 +1,108 @@
+import json
+import queue
+import logging
+import threading
+from weather_api import seconds_until_refresh
+
+logger = logging.getLogger('weather.live')
+
+# Never refresh a topic more often than this, even if the cache says so
+MIN_REFRESH_SECONDS = 30
+
+
+class _Topic:
+    """Subscribers and refresher state for one (location, units) pair"""
+    __slots__ = ('location', 'units', 'subscribers', 'last_payload', 'stop', 'thread')
+
+    def __init__(self, location, units):
+        self.location = location
+        self.units = units
+        self.subscribers = set()
+        self.last_payload = None
+        self.stop = threading.Event()
+        self.thread = None
+
+
+class LiveHub:
+    """
+    Fans weather updates out to Server-Sent Events subscribers
+
+    Each (location, units) topic has one background refresher, however many
+    clients are subscribed. The refresher wakes when the cached data for the
+    topic expires, builds the payload once, serializes it once, and pushes
+    the same string to every subscriber queue.
+
+    Args:
+        fetch (callable): fetch(location, units) -> JSON-serializable payload
+    """
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, location, units):
+        """
+        Subscribe to a topic, starting its refresher if needed
+
+        Returns:
+            queue.Queue: Receives serialized JSON payloads (latest value only)
+        """
+        subscription = queue.Queue(maxsize=1)
+        with self._lock:
+            topic = self._topics.get((location, units))
+            if topic is None:
+                topic = self._topics[(location, units)] = _Topic(location, units)
+                topic.thread = threading.Thread(
+                    target=self._refresh_loop, args=(topic,),
+                    name=f"live-{location}-{units}", daemon=True
+                )
+                topic.thread.start()
+            topic.subscribers.add(subscription)
+            if topic.last_payload is not None:
+                subscription.put_nowait(topic.last_payload)
+        return subscription
+
+    def unsubscribe(self, location, units, subscription):
+        """Remove a subscriber; the refresher stops with the last one"""
+        with self._lock:
+            topic = self._topics.get((location, units))
+            if topic is None:
+                return
+            topic.subscribers.discard(subscription)
+            if not topic.subscribers:
+                topic.stop.set()
+                del self._topics[(location, units)]
+
+    def topic_count(self):
+        """Number of topics with a running refresher"""
+        with self._lock:
+            return len(self._topics)
+
+    def _publish(self, topic, payload):
+        with self._lock:
+            topic.last_payload = payload
+            subscribers = list(topic.subscribers)
+        for subscription in subscribers:
+            # Slow clients only ever see the newest payload
+            try:
+                subscription.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                subscription.put_nowait(payload)
+            except queue.Full:
+                pass
+
+    def _refresh_loop(self, topic):
+        while not topic.stop.is_set():
+            try:
+                data = self.fetch(topic.location, topic.units)
+                payload = json.dumps(data, separators=(',', ':'))
+                if payload != topic.last_payload:
+                    self._publish(topic, payload)
+            except Exception as e:
+                logger.error("Live refresh failed for %s: %s", topic.location, e,
+                             extra={'event': 'live.refresh_failed', 'fields': {'location': topic.location}})
+            wait = max(seconds_until_refresh(topic.location, topic.units), MIN_REFRESH_SECONDS)
+            topic.stop.wait(wait)
@@ -0,0 +1,203 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Subsystem loggers; their levels can be changed at runtime via set_levels()
+SUBSYSTEMS = ('weather.api', 'weather.cache', 'weather.live', 'weather.auth')
+
+# Keep 1 in N records for high-volume events (by the `event` extra)
+DEFAULT_SAMPLE_RATES = {
+    'cache.hit': 100
+}
+
+_listener = None
+_queue_handler = None
+
+
+def _stop_listener():
+    # Flush whatever is still queued at interpreter exit
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener():
+    # The listener thread does not survive fork() (e.g. gunicorn workers
+    # forked from a master that configured logging): give the child its own
+    # queue, without the parent's pending records, and its own thread
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener)
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    One line per record: either logfmt-style text or JSON
+
+    Structured fields come from the record's `event` and `fields` extras,
+    e.g. logger.debug("Cache hit", extra={'event': 'cache.hit', 'fields': {'key': key}}).
+    """
+
+    def __init__(self, fmt='text'):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            entry['event'] = event
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+
+        if self.fmt == 'json':
+            return json.dumps(entry, default=str)
+        return ' '.join(f"{key}={_quote(value)}" for key, value in entry.items())
+
+
+def _quote(value):
+    text = str(value)
+    if not text or any(c in text for c in ' "='):
+        return json.dumps(text)
+    return text
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in N records for sampled events; everything else passes
+
+    Args:
+        rates (dict): Event name -> N (1 keeps everything)
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, 'event', None), 1)
+        if rate <= 1:
+            return True
+        with self._lock:
+            count = self._counts.get(record.event, 0)
+            self._counts[record.event] = count + 1
+        if count % rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread
+
+    The stock handler formats every record in the calling thread before
+    enqueueing it. Records never leave this process, so they can be queued
+    as-is and formatted off the request path.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _parse_levels(spec):
+    """Parse 'weather.cache=DEBUG,weather.api=INFO' into a dict"""
+    levels = {}
+    for part in filter(None, (p.strip() for p in (spec or '').split(','))):
+        name, _, level = part.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level=None, levels=None, fmt=None, sample_rates=None):
+    """
+    Install non-blocking structured logging on the root logger
+
+    Records go through a sampling filter into an in-memory queue; a single
+    listener thread formats and writes them.
+
+    Args:
+        level (str): Root level (default LOG_LEVEL env, INFO)
+        levels (dict): Per-logger levels (default LOG_LEVELS env, e.g.
+            'weather.cache=DEBUG,weather.api=INFO')
+        fmt (str): 'text' or 'json' (default LOG_FORMAT env, text)
+        sample_rates (dict): Event -> keep 1 in N (default DEFAULT_SAMPLE_RATES)
+    """
+    global _listener, _queue_handler
+
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'text')
+
+    if _listener is not None:
+        _listener.stop()
+
+    output = logging.StreamHandler()
+    output.setFormatter(StructuredFormatter(fmt))
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _queue_handler = handler
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+    set_levels(_parse_levels(os.environ.get('LOG_LEVELS')) if levels is None else levels)
+
+
+def set_levels(levels):
+    """
+    Change logger levels at runtime
+
+    Args:
+        levels (dict): Logger name -> level name (or None to inherit)
+
+    Returns:
+        dict: The resulting levels of the named loggers
+    """
+    for name, level in levels.items():
+        logger = logging.getLogger(None if name == 'root' else name)
+        logger.setLevel(level.upper() if level else logging.NOTSET)
+    return get_levels()
+
+
+def get_levels():
+    """Current level of the root logger and each subsystem logger"""
+    names = ('root',) + SUBSYSTEMS
+    return {
+        name: logging.getLevelName(logging.getLogger(None if name == 'root' else name).getEffectiveLevel())
+        for name in names
+    }
+
+
+def get_sampling_filter():
+    """Return the active SamplingFilter (to adjust rates at runtime), or None"""
+    for handler in logging.getLogger().handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, SamplingFilter):
+                return log_filter
+    return None
@@ -1,15 +1,12 @@
-import logging
-from app import app
-from database import db
-import models  # Import models to create tables
+from app import create_app, initialize
+from logging_setup import configure_logging
 
-# Set up logging for debugging
-logging.basicConfig(level=logging.DEBUG)
+# Set up non-blocking structured logging (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT)
+configure_logging()
 
-# Create database tables if they don't exist
-with app.app_context():
-    db.create_all()
-    logging.debug("Database tables created")
+app = create_app()
 
 if __name__ == '__main__':
+    # Under gunicorn this runs once in the master (see gunicorn.conf.py)
+    initialize(app)
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,184 @@
+import io
+import os
+import json
+import time
+import uuid
+import random
+import pstats
+import cProfile
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import weather_api
+from admin import is_admin_request
+
+logger = logging.getLogger('weather.profiling')
+
+# Summaries of recently profiled requests kept in memory
+RECENT_PROFILES = 200
+
+# Functions listed in each summary (by cumulative time)
+TOP_FUNCTIONS = 15
+
+# Accounting for the request being profiled in this context (None otherwise)
+_active = ContextVar('active_profile', default=None)
+
+_recent = deque(maxlen=RECENT_PROFILES)
+_recent_lock = threading.Lock()
+
+
+class RequestProfile:
+    """Counters and profiler for one profiled request"""
+    __slots__ = ('id', 'profiler', 'start', 'sql_count', 'sql_seconds', 'upstream_count', 'upstream_seconds')
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.profiler = cProfile.Profile()
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.upstream_count = 0
+        self.upstream_seconds = 0.0
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active.get() is not None:
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    if profile is not None and conn.info.get('query_start'):
+        profile.sql_count += 1
+        profile.sql_seconds += time.perf_counter() - conn.info['query_start'].pop()
+
+
+def _on_upstream(endpoint, seconds):
+    profile = _active.get()
+    if profile is not None:
+        profile.upstream_count += 1
+        profile.upstream_seconds += seconds
+
+
+def _should_profile():
+    if request.headers.get('X-Profile') and is_admin_request():
+        return True
+    rate = current_app.config.get('PROFILE_SAMPLE_RATE', 0)
+    return rate > 0 and random.random() < rate
+
+
+def _start():
+    if not _should_profile():
+        return
+    profile = RequestProfile()
+    try:
+        profile.profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process; an overlapping
+        # request simply goes unprofiled
+        logger.debug("Skipped profiling %s: another request is being profiled", request.path)
+        return
+    g.profile_token = _active.set(profile)
+
+
+def _finish(response):
+    token = g.pop('profile_token', None)
+    if token is None:
+        return response
+    profile = _active.get()
+    _active.reset(token)
+    profile.profiler.disable()
+    duration = time.perf_counter() - profile.start
+
+    summary = {
+        'id': profile.id,
+        'time': time.time(),
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'sql_count': profile.sql_count,
+        'sql_ms': round(profile.sql_seconds * 1000, 2),
+        'upstream_count': profile.upstream_count,
+        'upstream_ms': round(profile.upstream_seconds * 1000, 2),
+        'top_functions': _top_functions(profile.profiler)
+    }
+    try:
+        _dump(profile, summary)
+    except OSError as e:
+        logger.error("Could not write profile %s: %s", profile.id, e)
+    with _recent_lock:
+        evicted = _recent[0] if len(_recent) == _recent.maxlen else None
+        _recent.append(summary)
+    if evicted:
+        # Keep the dump directory bounded to the summaries still listed
+        for suffix in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(current_app.config['PROFILE_DIR'], evicted['id'] + suffix))
+            except OSError:
+                pass
+
+    response.headers['X-Profile-Id'] = profile.id
+    response.headers['Server-Timing'] = (
+        f"total;dur={summary['duration_ms']}, sql;dur={summary['sql_ms']}, upstream;dur={summary['upstream_ms']}"
+    )
+    return response
+
+
+def _abandon(exc):
+    # after_request did not run (unhandled error); never leave a profiler enabled
+    token = g.pop('profile_token', None)
+    if token is not None:
+        _active.get().profiler.disable()
+        _active.reset(token)
+
+
+def _top_functions(profiler):
+    stats = pstats.Stats(profiler, stream=io.StringIO()).sort_stats('cumulative')
+    top = []
+    for (filename, line, name), (_, calls, _, cumtime, _) in stats.stats.items():
+        top.append({'function': f"{os.path.basename(filename)}:{line}({name})", 'calls': calls,
+                    'cum_ms': round(cumtime * 1000, 2)})
+    top.sort(key=lambda x: x['cum_ms'], reverse=True)
+    return top[:TOP_FUNCTIONS]
+
+
+def _dump(profile, summary):
+    directory = current_app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    profile.profiler.dump_stats(os.path.join(directory, f"{profile.id}.prof"))
+    with open(os.path.join(directory, f"{profile.id}.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def slowest_profiles(limit=20):
+    """Summaries of recently profiled requests, slowest first"""
+    with _recent_lock:
+        summaries = list(_recent)
+    summaries.sort(key=lambda x: x['duration_ms'], reverse=True)
+    return summaries[:limit]
+
+
+def init_profiling(app):
+    """
+    Enable opt-in request profiling on an app
+
+    A request is profiled when it carries X-Profile plus a valid admin token,
+    or at random with probability PROFILE_SAMPLE_RATE. Profiled requests get
+    a cProfile dump and a JSON summary (SQL and upstream call counts/times)
+    in PROFILE_DIR, plus X-Profile-Id and Server-Timing response headers.
+    """
+    app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.environ.get('PROFILE_SAMPLE_RATE', 0)))
+    app.config.setdefault('PROFILE_DIR', os.environ.get('PROFILE_DIR', os.path.join(app.instance_path, 'profiles')))
+    app.before_request(_start)
+    app.after_request(_finish)
+    app.teardown_request(_abandon)
+    if _on_upstream not in weather_api.upstream_listeners:
+        weather_api.upstream_listeners.append(_on_upstream)
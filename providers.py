@@ -0,0 +1,207 @@
+import os
+import gzip
+import json
+import time
+import random
+import logging
+import threading
+from abc import ABC, abstractmethod
+import requests
+from deadline import DeadlineExceeded, remaining, timeout_for
+
+BASE_URL = "https://api.openweathermap.org/data/2.5"
+GEO_URL = "https://api.openweathermap.org/geo/1.0/direct"
+
+# Upstream endpoints by name
+ENDPOINTS = {
+    'weather': f"{BASE_URL}/weather",
+    'forecast': f"{BASE_URL}/forecast",
+    'geo': GEO_URL
+}
+
+# Params that must never be written to an archive or used in replay keys
+SECRET_PARAMS = ('appid',)
+
+
+class ReplayMissError(requests.exceptions.RequestException):
+    """Raised when a replay archive has no response for a request"""
+
+
+def request_key(endpoint, params):
+    """
+    Stable key for an upstream request, ignoring secrets
+
+    Args:
+        endpoint (str): Endpoint name ('weather', 'forecast' or 'geo')
+        params (dict): Query parameters
+
+    Returns:
+        str: Key such as 'weather?lat=40.7&lon=-74.0&units=metric'
+    """
+    query = '&'.join(
+        f"{name}={params[name]}" for name in sorted(params) if name not in SECRET_PARAMS
+    )
+    return f"{endpoint}?{query}"
+
+
+class WeatherProvider(ABC):
+    """
+    Source of raw upstream responses
+
+    Subclasses implement fetch(); weather_api only ever talks to a provider,
+    never to requests directly.
+    """
+
+    @abstractmethod
+    def fetch(self, endpoint, params):
+        """
+        Fetch one upstream response
+
+        Args:
+            endpoint (str): Endpoint name ('weather', 'forecast' or 'geo')
+            params (dict): Query parameters
+
+        Returns:
+            Decoded JSON body
+
+        Raises:
+            requests.exceptions.RequestException: On any upstream failure
+        """
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """Live provider using a pooled requests session"""
+
+    def __init__(self, session=None, timeout=10):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def fetch(self, endpoint, params):
+        # Never wait longer than the current request has left
+        timeout = timeout_for(self.timeout)
+        try:
+            response = self.session.get(ENDPOINTS[endpoint], params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(f"Deadline exceeded calling {endpoint}") from None
+            raise
+        response.raise_for_status()
+        return response.json()
+
+
+class RecordingProvider(WeatherProvider):
+    """
+    Wraps another provider and appends every successful response to a
+    gzip-compressed JSON-lines archive
+    """
+
+    def __init__(self, path, inner=None):
+        self.path = path
+        self.inner = inner or OpenWeatherMapProvider()
+        self._lock = threading.Lock()
+
+    def fetch(self, endpoint, params):
+        body = self.inner.fetch(endpoint, params)
+        record = {
+            'key': request_key(endpoint, params),
+            'endpoint': endpoint,
+            'params': {k: v for k, v in params.items() if k not in SECRET_PARAMS},
+            'body': body
+        }
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            # Each append is its own gzip member; readers see one stream
+            with gzip.open(self.path, 'at', encoding='utf-8') as archive:
+                archive.write(line)
+        return body
+
+
+class ReplayProvider(WeatherProvider):
+    """
+    Serves responses from a recorded archive held in memory
+
+    Args:
+        path (str): Archive written by RecordingProvider
+        latency (float): Simulated upstream latency in seconds
+        jitter (float): Extra random latency, uniform in [0, jitter]
+    """
+
+    def __init__(self, path, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.responses = load_archive(path)
+
+    def fetch(self, endpoint, params):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            # Behave like a live call that hits the request deadline
+            wait = timeout_for(delay)
+            time.sleep(wait)
+            if wait < delay:
+                raise DeadlineExceeded(f"Deadline exceeded calling {endpoint}")
+        key = request_key(endpoint, params)
+        try:
+            return self.responses[key]
+        except KeyError:
+            raise ReplayMissError(f"No recorded response for {key}") from None
+
+
+def load_archive(path):
+    """
+    Load a recorded archive into memory (later records win)
+
+    Returns:
+        dict: request key -> decoded body
+    """
+    responses = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            if line.strip():
+                record = json.loads(line)
+                responses[record['key']] = record['body']
+    logging.info("Loaded %d recorded responses from %s", len(responses), path)
+    return responses
+
+
+def provider_from_env():
+    """
+    Build the provider selected by the environment
+
+    WEATHER_PROVIDER: 'live' (default), 'record' or 'replay'
+    WEATHER_ARCHIVE: archive path for record/replay (default weather_archive.jsonl.gz)
+    WEATHER_REPLAY_LATENCY / WEATHER_REPLAY_JITTER: simulated latency in seconds
+    """
+    mode = os.environ.get('WEATHER_PROVIDER', 'live')
+    path = os.environ.get('WEATHER_ARCHIVE', 'weather_archive.jsonl.gz')
+    if mode == 'record':
+        return RecordingProvider(path)
+    if mode == 'replay':
+        return ReplayProvider(
+            path,
+            latency=float(os.environ.get('WEATHER_REPLAY_LATENCY', 0)),
+            jitter=float(os.environ.get('WEATHER_REPLAY_JITTER', 0))
+        )
+    if mode != 'live':
+        raise ValueError(f"Unknown WEATHER_PROVIDER: {mode}")
+    return OpenWeatherMapProvider()
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Return the active provider, creating it from the environment on first use"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider):
+    """Replace the active provider (e.g. with a ReplayProvider for load tests)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,131 @@
+from array import array
+from dataclasses import dataclass
+from typing import NamedTuple
+
+
+class Coordinates(NamedTuple):
+    """Latitude/longitude pair (still unpacks like the old ``(lat, lon)`` tuple)"""
+    lat: float
+    lon: float
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentWeather:
+    """Compact record for a current-weather observation"""
+    location: str
+    country: str
+    temperature: int
+    feels_like: int
+    humidity: int
+    pressure: int
+    wind_speed: float
+    wind_direction: int
+    description: str
+    icon: str
+    main: str
+    timestamp: int
+    sunrise: int
+    sunset: int
+    latitude: float
+    longitude: float
+    units: str
+
+    @classmethod
+    def from_api(cls, data, location, units):
+        """
+        Build a record from a raw OpenWeatherMap /weather response
+
+        Args:
+            data (dict): Decoded JSON response
+            location (str): Requested location, used when the response has no name
+            units (str): 'metric' or 'imperial'
+
+        Returns:
+            CurrentWeather: Parsed record
+        """
+        main = data.get('main', {})
+        sys = data.get('sys', {})
+        wind = data.get('wind', {})
+        weather = (data.get('weather') or [{}])[0]
+        coord = data.get('coord', {})
+        return cls(
+            location=data.get('name', location),
+            country=sys.get('country', ''),
+            temperature=round(main.get('temp', 0)),
+            feels_like=round(main.get('feels_like', 0)),
+            humidity=main.get('humidity', 0),
+            pressure=main.get('pressure', 0),
+            wind_speed=wind.get('speed', 0),
+            wind_direction=wind.get('deg', 0),
+            description=weather.get('description', ''),
+            icon=weather.get('icon', ''),
+            main=weather.get('main', ''),
+            timestamp=data.get('dt', 0),
+            sunrise=sys.get('sunrise', 0),
+            sunset=sys.get('sunset', 0),
+            latitude=coord.get('lat', 0),
+            longitude=coord.get('lon', 0),
+            units=units,
+        )
+
+    def to_dict(self):
+        """Return the JSON shape used by templates and the API"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(frozen=True, slots=True)
+class DailyForecast:
+    """Compact record for one aggregated forecast day"""
+    date: str
+    avg_temp: int
+    icon: str
+    description: str
+    units: str
+
+    def to_dict(self):
+        """Return the JSON shape used by templates and the API"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(frozen=True, slots=True)
+class ForecastSeries:
+    """Raw 3-hour forecast slots stored column-wise in typed arrays"""
+    timestamps: array
+    temperature: array
+    feels_like: array
+    humidity: array
+
+    @classmethod
+    def from_api(cls, slots):
+        """
+        Build the series from the 'list' of a raw /forecast response
+
+        Args:
+            slots (list): Forecast slots as returned by OpenWeatherMap
+
+        Returns:
+            ForecastSeries: Slots sorted by timestamp
+        """
+        timestamps, temperature, feels_like, humidity = array('q'), array('d'), array('d'), array('d')
+        for slot in sorted(slots, key=lambda x: x.get('dt', 0)):
+            main = slot.get('main', {})
+            timestamps.append(slot.get('dt', 0))
+            temperature.append(main.get('temp', 0))
+            feels_like.append(main.get('feels_like', main.get('temp', 0)))
+            humidity.append(main.get('humidity', 0))
+        return cls(timestamps, temperature, feels_like, humidity)
+
+    def columns(self):
+        """Return the value columns by name (timestamps excluded)"""
+        return {
+            'temperature': self.temperature,
+            'feels_like': self.feels_like,
+            'humidity': self.humidity
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Forecast:
+    """Cached forecast: aggregated days plus the raw slots they came from"""
+    days: tuple
+    series: ForecastSeries
@@ -0,0 +1,184 @@
+import os
+import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+from deadline import DeadlineExceeded, timeout_for
+
+# Password hashing settings
+# PASSWORD_HASH_METHOD is any werkzeug method string, e.g. 'scrypt',
+# 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'.
+# PASSWORD_HASH_WORKERS=0 hashes inline in the request thread.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+# MAX_PENDING is the queue depth: a few hashes per worker absorb a burst of
+# logins, while staying well below the request thread count since each
+# pending hash holds a request thread while it waits
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 4 * PASSWORD_HASH_WORKERS))
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 5))
+
+# Login throttling: at most `attempts` per `window` seconds for each key
+# ('register' is a separate per-IP budget for sign-ups)
+THROTTLE_LIMITS = {
+    'ip': {'attempts': 20, 'window': 60},
+    'username': {'attempts': 5, 'window': 60},
+    'register': {'attempts': 10, 'window': 600}
+}
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer"""
+
+
+class PasswordHasher:
+    """
+    Runs password hashing in a bounded process pool
+
+    Hashing is deliberately CPU-heavy; doing it in a separate process keeps
+    request workers free for other traffic. At most `max_pending` hashes can
+    be queued or running; beyond that callers wait for a slot, and get
+    HashingBusy if none frees up within `timeout` (or the request deadline).
+
+    Args:
+        method (str): werkzeug hashing method for new hashes
+        workers (int): Pool size (0 hashes inline)
+        max_pending (int): Maximum hashes queued or running at once
+        timeout (float): Seconds to wait for a slot and the result together
+    """
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING, timeout=PASSWORD_HASH_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Created on first use so every gunicorn worker gets its own pool;
+        # forkserver avoids forking a multi-threaded request worker
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('forkserver')
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        try:
+            wait = timeout_for(self.timeout)
+        except DeadlineExceeded:
+            raise HashingBusy("Request deadline exceeded") from None
+        give_up = time.monotonic() + wait
+        if not self._slots.acquire(timeout=wait):
+            raise HashingBusy("Password hashing queue is full")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._discard(executor)
+            raise HashingBusy("Password hashing pool failed") from None
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=max(give_up - time.monotonic(), 0))
+        except FutureTimeoutError:
+            raise HashingBusy("Password hashing timed out") from None
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HashingBusy("Password hashing pool failed") from None
+
+    def _discard(self, executor):
+        # A pool whose child died (OOM, kill) stays broken; drop it so the
+        # next call starts a fresh one
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Check a password against a stored hash"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def shutdown(self):
+        """Stop the pool (it is recreated on next use)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class LoginThrottle:
+    """
+    Sliding-window attempt limiter keyed by IP address and username
+
+    Each kind of key has its own limit and attempts, so registrations
+    (`register=ip`) do not use up the login budget of the same address.
+
+    Checked before any hashing work so a burst of attempts costs almost
+    nothing once a key is over its limit.
+
+    Args:
+        limits (dict): Key kind -> {'attempts': int, 'window': seconds}
+    """
+
+    def __init__(self, limits=THROTTLE_LIMITS):
+        self.limits = limits
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def allow(self, **keys):
+        """
+        Record an attempt unless any key is over its limit
+
+        Args:
+            **keys: Key kind -> value, e.g. ip='1.2.3.4', username='bob' or register='1.2.3.4'
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the next attempt is allowed
+        """
+        now = time.monotonic()
+        retry_after = 0
+        with self._lock:
+            windows = []
+            for kind, value in keys.items():
+                if value is None or kind not in self.limits:
+                    continue
+                limit = self.limits[kind]
+                attempts = self._attempts.setdefault((kind, value), deque())
+                while attempts and now - attempts[0] > limit['window']:
+                    attempts.popleft()
+                if len(attempts) >= limit['attempts']:
+                    retry_after = max(retry_after, limit['window'] - (now - attempts[0]))
+                windows.append(attempts)
+            if retry_after:
+                return retry_after
+            for attempts in windows:
+                attempts.append(now)
+            if len(self._attempts) > 10000:
+                self._prune(now)
+        return 0
+
+    def _prune(self, now):
+        # Drop keys whose whole window has passed
+        for key in [k for k, v in self._attempts.items() if not v or now - v[-1] > self.limits[k[0]]['window']]:
+            del self._attempts[key]
+
+
+password_hasher = PasswordHasher()
+login_throttle = LoginThrottle()
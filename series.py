@@ -0,0 +1,83 @@
+from bisect import bisect_right
+
+
+def interpolate(timestamps, columns, step):
+    """
+    Resample series onto a uniform time grid by linear interpolation
+
+    Args:
+        timestamps (sequence): Sorted Unix timestamps
+        columns (dict): Name -> sequence of values, parallel to timestamps
+        step (int): Grid interval in seconds
+
+    Returns:
+        tuple: (grid timestamps, dict of resampled columns)
+    """
+    if len(timestamps) < 2 or step <= 0:
+        return list(timestamps), {name: list(values) for name, values in columns.items()}
+
+    first, last = timestamps[0], timestamps[-1]
+    grid = list(range(first, last + 1, step))
+    resampled = {name: [] for name in columns}
+    for t in grid:
+        # Index of the right-hand neighbour, clamped to the last interval
+        i = min(max(bisect_right(timestamps, t), 1), len(timestamps) - 1)
+        t0, t1 = timestamps[i - 1], timestamps[i]
+        weight = (t - t0) / (t1 - t0) if t1 != t0 else 0.0
+        for name, values in columns.items():
+            v0, v1 = values[i - 1], values[i]
+            resampled[name].append(v0 + (v1 - v0) * weight)
+    return grid, resampled
+
+
+def downsample(timestamps, columns, points):
+    """
+    Reduce series to at most `points` samples by averaging equal-size buckets
+
+    Each bucket is represented by its first timestamp and the mean of its values.
+
+    Args:
+        timestamps (sequence): Unix timestamps
+        columns (dict): Name -> sequence of values, parallel to timestamps
+        points (int): Maximum number of samples to return
+
+    Returns:
+        tuple: (timestamps, dict of downsampled columns)
+    """
+    n = len(timestamps)
+    if points <= 0 or n <= points:
+        return list(timestamps), {name: list(values) for name, values in columns.items()}
+
+    bounds = [round(k * n / points) for k in range(points + 1)]
+    reduced_t = [timestamps[bounds[k]] for k in range(points)]
+    reduced = {
+        name: [sum(values[bounds[k]:bounds[k + 1]]) / (bounds[k + 1] - bounds[k]) for k in range(points)]
+        for name, values in columns.items()
+    }
+    return reduced_t, reduced
+
+
+def columnar_series(series, units, step=None, points=None, precision=1):
+    """
+    Build the compact JSON layout for a ForecastSeries
+
+    Args:
+        series (ForecastSeries): Raw forecast slots
+        units (str): 'metric' or 'imperial'
+        step (int): Optional resampling interval in seconds
+        points (int): Optional maximum number of points
+        precision (int): Decimal places kept in values
+
+    Returns:
+        dict: {'units': ..., 't': [...], '<column>': [...], ...}
+    """
+    timestamps, columns = series.timestamps, series.columns()
+    if step:
+        timestamps, columns = interpolate(timestamps, columns, step)
+    if points:
+        timestamps, columns = downsample(timestamps, columns, points)
+
+    payload = {'units': units, 't': list(timestamps)}
+    for name, values in columns.items():
+        payload[name] = [round(value, precision) for value in values]
+    return payload
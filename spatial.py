@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.2
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points
+
+    Args:
+        lat1, lon1, lat2, lon2 (float): Coordinates in degrees
+
+    Returns:
+        float: Distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Grid-hash spatial index over cached observations
+
+    Points are bucketed into fixed-size lat/lon cells; a radius query only
+    scans the cells overlapping the search box. Each point carries the cache
+    key holding the observation and the time it was stored.
+    """
+
+    def __init__(self, cell_degrees=0.05):
+        self.cell_degrees = cell_degrees
+        self._cells = {}
+        self._lock = threading.Lock()
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def insert(self, lat, lon, key, stored_at=None):
+        """
+        Add (or refresh) a point
+
+        Args:
+            lat, lon (float): Coordinates in degrees
+            key (str): Cache key of the observation
+            stored_at (float): Unix time the observation was cached
+        """
+        stored_at = time.time() if stored_at is None else stored_at
+        with self._lock:
+            self._cells.setdefault(self._cell(lat, lon), {})[key] = (lat, lon, stored_at)
+
+    def remove(self, lat, lon, key):
+        """Drop a point, e.g. once its cache entry has expired"""
+        cell = self._cell(lat, lon)
+        with self._lock:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._cells[cell]
+
+    def nearby(self, lat, lon, radius_km, max_age=None, now=None):
+        """
+        Find points within a radius, nearest first
+
+        Args:
+            lat, lon (float): Query coordinates in degrees
+            radius_km (float): Search radius in kilometres
+            max_age (float): Ignore points stored more than this many seconds ago
+            now (float): Current Unix time (defaults to time.time())
+
+        Returns:
+            list: (distance_km, key, lat, lon, stored_at) tuples sorted by distance
+        """
+        now = time.time() if now is None else now
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+
+        matches = []
+        with self._lock:
+            for i in range(lat_lo, lat_hi + 1):
+                for j in range(lon_lo, lon_hi + 1):
+                    bucket = self._cells.get((i, j))
+                    if not bucket:
+                        continue
+                    for key, (plat, plon, stored_at) in bucket.items():
+                        if max_age is not None and now - stored_at > max_age:
+                            continue
+                        distance = haversine_km(lat, lon, plat, plon)
+                        if distance <= radius_km:
+                            matches.append((distance, key, plat, plon, stored_at))
+        matches.sort()
+        return matches
+
+    def prune(self, max_age, now=None):
+        """
+        Drop points stored more than `max_age` seconds ago
+
+        Args:
+            max_age (float): Age in seconds beyond which points are removed
+            now (float): Current Unix time (defaults to time.time())
+
+        Returns:
+            int: Number of points removed
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        removed = 0
+        with self._lock:
+            for cell in list(self._cells):
+                bucket = self._cells[cell]
+                stale = [key for key, (_, _, stored_at) in bucket.items() if stored_at < cutoff]
+                for key in stale:
+                    del bucket[key]
+                removed += len(stale)
+                if not bucket:
+                    del self._cells[cell]
+        return removed
+
+    def clear(self):
+        """Remove all points"""
+        with self._lock:
+            self._cells.clear()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(bucket) for bucket in self._cells.values())
@@ -7,6 +7,12 @@
 let temperatureChart = null;
 let humidityChart = null;
 
+// Forecast seen by the last update (units + daily forecast)
+let lastForecastKey = null;
+
+// Hourly series currently drawn on the charts (null until it first arrives)
+let lastSeries = null;
+
 /**
  * Initialize charts on page load
  */
@@ -24,6 +30,56 @@ function initCharts() {
         const initialData = extractHumidityDataFromDOM();
         humidityChart = createHumidityChart(humidityCtx, initialData);
     }
+    
+    // Replace the daily view with the hourly curve once it arrives
+    loadForecastSeries();
+}
+
+/**
+ * Fetches the raw 3-hourly forecast series (served from the cached forecast)
+ */
+function loadForecastSeries() {
+    if (!temperatureChart && !humidityChart) return;
+    
+    if (!document.getElementById('current-location')?.dataset?.location) return;
+    const units = document.getElementById('units-toggle')?.dataset?.units || 'metric';
+    
+    fetch(`/api/forecast/series?${locationQuery()}&units=${units}`)
+        .then(response => response.json())
+        .then(series => {
+            if (series.error || !Array.isArray(series.t)) return;
+            applyForecastSeries(series);
+        })
+        .catch(error => {
+            console.error('Error fetching forecast series:', error);
+        });
+}
+
+/**
+ * Draws a columnar forecast series ({t, temperature, feels_like, humidity}) on the charts
+ */
+function applyForecastSeries(series) {
+    lastSeries = series;
+    const labels = series.t.map(t => new Date(t * 1000).toLocaleString('en-US', { weekday: 'short', hour: 'numeric' }));
+    
+    if (temperatureChart) {
+        const tempUnit = series.units === 'metric' ? '°C' : '°F';
+        temperatureChart.data.labels = labels;
+        temperatureChart.data.datasets[0].label = `Temperature (${tempUnit})`;
+        temperatureChart.data.datasets[1].label = `Feels Like (${tempUnit})`;
+        temperatureChart.data.datasets[0].data = series.temperature;
+        temperatureChart.data.datasets[1].data = series.feels_like;
+        temperatureChart.data.datasets.forEach(dataset => {
+            dataset.pointRadius = 0;
+        });
+        temperatureChart.update();
+    }
+    
+    if (humidityChart) {
+        humidityChart.data.labels = labels;
+        humidityChart.data.datasets[0].data = series.humidity;
+        humidityChart.update();
+    }
 }
 
 /**
@@ -205,6 +261,19 @@ function extractHumidityDataFromDOM() {
 function updateCharts(currentWeather, forecastData) {
     if (!currentWeather || !forecastData) return;
     
+    // The first update after page load repeats what initCharts() already fetched
+    const forecastKey = `${currentWeather.units}:${JSON.stringify(forecastData)}`;
+    const forecastChanged = lastForecastKey !== null && forecastKey !== lastForecastKey;
+    lastForecastKey = forecastKey;
+    
+    // Keep the hourly curve once it is drawn; refetch it only for a new forecast
+    if (lastSeries) {
+        if (forecastChanged) {
+            loadForecastSeries();
+        }
+        return;
+    }
+    
     // Update temperature chart
     if (temperatureChart) {
         const units = currentWeather.units;
@@ -236,4 +305,8 @@ function updateCharts(currentWeather, forecastData) {
         humidityChart.data.datasets[0].data = [currentWeather.humidity];
         humidityChart.update();
     }
+    
+    if (forecastChanged) {
+        loadForecastSeries();
+    }
 }
@@ -14,6 +14,10 @@ const weatherContainer = document.getElementById('weather-container');
 const forecastContainer = document.getElementById('forecast-container');
 const lastUpdatedElement = document.getElementById('last-updated');
 
+// Refresh interval used when live updates are unavailable
+const POLL_INTERVAL_MS = 5 * 60 * 1000;
+let pollTimer = null;
+
 // Event listeners
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize search with autocomplete
@@ -42,6 +46,9 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Update the "last updated" timestamp
     updateLastUpdatedTime();
+
+    // Receive live updates instead of polling
+    subscribeToLiveUpdates();
 });
 
 /**
@@ -119,6 +126,18 @@ function setupLocationAutocomplete() {
     });
 }
 
+/**
+ * Query string selecting the displayed location.
+ * Uses coordinates when the page has them so the server skips geocoding.
+ */
+function locationQuery() {
+    const data = document.getElementById('current-location')?.dataset || {};
+    if (data.lat && data.lon) {
+        return `lat=${data.lat}&lon=${data.lon}`;
+    }
+    return `location=${encodeURIComponent(data.location || 'New York')}`;
+}
+
 /**
  * Refreshes weather data via AJAX
  */
@@ -134,27 +153,17 @@ function refreshWeatherData() {
     }
     
     // Get current location and units from the page
-    const location = document.getElementById('current-location')?.dataset?.location || 'New York';
     const units = document.getElementById('units-toggle')?.dataset?.units || 'metric';
     
     // Fetch updated weather data
-    fetch(`/api/weather?location=${encodeURIComponent(location)}&units=${units}`)
+    fetch(`/api/weather?${locationQuery()}&units=${units}`)
         .then(response => response.json())
         .then(data => {
             if (loadingIndicator) {
                 loadingIndicator.classList.add('d-none');
             }
             
-            if (data.error) {
-                showError(data.error);
-                return;
-            }
-            
-            // Update the UI with new data
-            updateCurrentWeather(data.current_weather);
-            updateForecast(data.forecast);
-            updateCharts(data.current_weather, data.forecast);
-            updateLastUpdatedTime();
+            applyWeatherData(data);
         })
         .catch(error => {
             if (loadingIndicator) {
@@ -165,6 +174,54 @@ function refreshWeatherData() {
         });
 }
 
+/**
+ * Applies an /api/weather payload to the page
+ */
+function applyWeatherData(data) {
+    if (data.error) {
+        showError(data.error);
+        return;
+    }
+    
+    // Update the UI with new data
+    updateCurrentWeather(data.current_weather);
+    updateForecast(data.forecast);
+    updateCharts(data.current_weather, data.forecast);
+    updateLastUpdatedTime();
+}
+
+/**
+ * Subscribes to server-pushed updates for the displayed location.
+ * The server refreshes each location once and pushes it to every open tab.
+ */
+function subscribeToLiveUpdates() {
+    const locationElement = document.getElementById('current-location');
+    if (!window.EventSource || !locationElement) return;
+    
+    const units = document.getElementById('units-toggle')?.dataset?.units || 'metric';
+    const source = new EventSource(`/api/weather/stream?${locationQuery()}&units=${units}`);
+    
+    source.onmessage = function(event) {
+        try {
+            applyWeatherData(JSON.parse(event.data));
+        } catch (error) {
+            console.error('Error applying live weather update:', error);
+        }
+    };
+    
+    // A busy server refuses the stream (503) and the browser gives up on it; poll instead
+    source.onerror = function() {
+        if (source.readyState === EventSource.CLOSED) {
+            startPolling();
+        }
+    };
+    
+    // Close the stream when the page goes away so the server can drop the subscription
+    window.addEventListener('beforeunload', function() {
+        source.close();
+    });
+}
+
 /**
  * Updates the current weather display
  */
@@ -295,3 +352,11 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 });
+
+/**
+ * Periodically refreshes weather data (fallback when live updates are refused)
+ */
+function startPolling() {
+    if (pollTimer) return;
+    pollTimer = setInterval(refreshWeatherData, POLL_INTERVAL_MS);
+}
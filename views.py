@@ -0,0 +1,492 @@
+import queue
+import logging
+from flask import Blueprint, Response, current_app, g, render_template, request, jsonify, redirect, url_for, session, flash
+from flask_login import login_user, logout_user, login_required, current_user
+from weather_api import get_current_weather, get_forecast, get_forecast_series, get_location_data, get_cached_weather, get_coordinates
+from database import db
+from models import User, FavoriteLocation
+from live import LiveHub
+from security import password_hasher, login_throttle, HashingBusy
+from deadline import DeadlineExceeded, start_deadline, clear_deadline
+
+bp = Blueprint('main', __name__)
+
+auth_logger = logging.getLogger('weather.auth')
+
+# Default location (New York)
+DEFAULT_LOCATION = "New York"
+DEFAULT_UNITS = "metric"  # 'metric' for Celsius, 'imperial' for Fahrenheit
+
+# Smallest resampling interval accepted by /api/forecast/series (seconds)
+MIN_SERIES_STEP = 15 * 60
+
+# Seconds between SSE comment lines that keep idle connections open
+STREAM_KEEPALIVE = 15
+
+def weather_payload(location, units):
+    """Build the /api/weather response body for a location"""
+    current_weather = get_current_weather(location, units)
+    forecast_data = get_forecast(location, units)
+    
+    if not current_weather or 'error' in current_weather:
+        return {'error': current_weather.get('error', 'Failed to fetch weather data')}
+    
+    return {
+        'current_weather': current_weather,
+        'forecast': forecast_data
+    }
+
+# One refresher per (location, units), shared by every open stream
+live_hub = LiveHub(weather_payload)
+
+def requested_location(default=DEFAULT_LOCATION):
+    """
+    Location selected by the query string
+    
+    `lat` and `lon` win over `location` when both are valid, so links that
+    carry coordinates (e.g. favorites) never need geocoding.
+    
+    Returns:
+        tuple or str: (lat, lon), a location name, or `default`
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    if lat is not None and lon is not None and -90 <= lat <= 90 and -180 <= lon <= 180:
+        return (round(lat, 4), round(lon, 4))
+    return request.args.get('location') or default
+
+def session_location():
+    """Location last shown in this session (coordinates if it was opened by them)"""
+    coordinates = session.get('coordinates')
+    if coordinates:
+        return tuple(coordinates)
+    return session.get('location', DEFAULT_LOCATION)
+
+# Endpoints that may call upstream and are subject to admission control
+ADMITTED_ENDPOINTS = {'main.index', 'main.api_weather', 'main.api_forecast_series', 'main.api_location'}
+
+# Long-lived endpoints that get no request deadline
+UNBOUNDED_ENDPOINTS = {'main.api_weather_stream'}
+
+@bp.before_request
+def start_request_budget():
+    """Give the request a deadline and admit it or shed it"""
+    if request.endpoint in UNBOUNDED_ENDPOINTS:
+        return None
+    g.deadline_token = start_deadline(current_app.config['REQUEST_DEADLINE'])
+    
+    if request.endpoint in ADMITTED_ENDPOINTS:
+        if not current_app.extensions['admission'].try_acquire():
+            return shed_response()
+        g.admitted = True
+    return None
+
+@bp.teardown_request
+def end_request_budget(exc):
+    """Release the admission slot and deadline taken in start_request_budget()"""
+    if g.pop('admitted', False):
+        current_app.extensions['admission'].release()
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        clear_deadline(token)
+
+def shed_response():
+    """Answer a request turned away by admission control: cached data if we have it, else 503"""
+    # Pick the location and units the same way the endpoint itself does
+    if request.endpoint == 'main.index':
+        location = requested_location(None) or session_location()
+        units = request.args.get('units') or session.get('units', DEFAULT_UNITS)
+    else:
+        location = requested_location()
+        units = request.args.get('units', DEFAULT_UNITS)
+    cached = get_cached_weather(location, units) if request.endpoint in ('main.index', 'main.api_weather') else None
+    
+    if cached and request.endpoint == 'main.api_weather':
+        response = jsonify({'current_weather': cached[0], 'forecast': cached[1]})
+    elif cached:
+        response = current_app.make_response(render_template('index.html',
+                                                             current_weather=cached[0],
+                                                             forecast=cached[1],
+                                                             location=cached[0]['location'] if isinstance(location, tuple) else location,
+                                                             coordinates=location if isinstance(location, tuple) else None,
+                                                             units=units))
+    elif request.path.startswith('/api/'):
+        response = current_app.make_response((jsonify({'error': 'Server busy, please retry shortly'}), 503))
+    else:
+        response = current_app.make_response((render_template('error.html', error='Server busy, please retry shortly'), 503))
+    
+    response.headers['X-Load-Shed'] = 'cached' if cached else 'rejected'
+    if not cached:
+        response.headers['Retry-After'] = '1'
+    return response
+
+@bp.app_errorhandler(DeadlineExceeded)
+def deadline_exceeded(e):
+    """Handle requests that ran out of time budget"""
+    if request.path.startswith('/api/'):
+        return jsonify({'error': 'Request timed out'}), 504
+    return render_template('error.html', error="Request timed out"), 504
+
+@bp.route('/')
+def index():
+    """Render the main page with weather information"""
+    # Get location from query parameters (coordinates or name), session, or default
+    location = requested_location(None) or session_location()
+    units = request.args.get('units') or session.get('units', DEFAULT_UNITS)
+    
+    # Store in session
+    if isinstance(location, tuple):
+        session['coordinates'] = list(location)
+    else:
+        session.pop('coordinates', None)
+        session['location'] = location
+    session['units'] = units
+    
+    try:
+        # Get weather data
+        current_weather = get_current_weather(location, units)
+        forecast_data = get_forecast(location, units)
+        
+        # Check if data was successfully retrieved
+        if not current_weather or 'error' in current_weather:
+            return render_template('error.html', error=current_weather.get('error', 'Failed to fetch weather data'))
+        
+        coordinates = None
+        if isinstance(location, tuple):
+            coordinates = location
+            location = session['location'] = current_weather['location']
+        
+        return render_template('index.html', 
+                              current_weather=current_weather, 
+                              forecast=forecast_data,
+                              location=location,
+                              coordinates=coordinates,
+                              units=units)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Error fetching weather data: {str(e)}")
+        return render_template('error.html', error=str(e))
+
+@bp.route('/api/weather')
+def api_weather():
+    """API endpoint for AJAX calls to refresh weather data"""
+    location = requested_location()
+    units = request.args.get('units', DEFAULT_UNITS)
+    
+    try:
+        return jsonify(weather_payload(location, units))
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"API Error: {str(e)}")
+        return jsonify({'error': str(e)})
+
+@bp.route('/api/weather/stream')
+def api_weather_stream():
+    """Server-Sent Events stream of weather updates for one location"""
+    location = requested_location()
+    units = request.args.get('units', DEFAULT_UNITS)
+    if units not in ('metric', 'imperial'):
+        units = DEFAULT_UNITS
+    
+    # Each open stream holds a worker thread; past the cap the client falls back to polling
+    streams = current_app.extensions['streams']
+    if not streams.try_acquire():
+        response = jsonify({'error': 'Too many live streams, please refresh instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '60'
+        return response
+    
+    subscription = live_hub.subscribe(location, units)
+    
+    def stream():
+        while True:
+            try:
+                payload = subscription.get(timeout=STREAM_KEEPALIVE)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {payload}\n\n"
+    
+    def close():
+        # Runs when the server closes the response, even if streaming never started
+        live_hub.unsubscribe(location, units, subscription)
+        streams.release()
+    
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    response.call_on_close(close)
+    return response
+
+@bp.route('/api/forecast/series')
+def api_forecast_series():
+    """API endpoint for the raw 3-hour forecast as parallel arrays (for charts)"""
+    location = requested_location()
+    units = request.args.get('units', DEFAULT_UNITS)
+    step = request.args.get('step', type=int)
+    points = request.args.get('points', type=int)
+    
+    if step is not None and step < MIN_SERIES_STEP:
+        return jsonify({'error': f"step must be at least {MIN_SERIES_STEP} seconds"}), 400
+    if points is not None and points < 1:
+        return jsonify({'error': 'points must be positive'}), 400
+    
+    try:
+        return jsonify(get_forecast_series(location, units, step=step, points=points))
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Forecast series API Error: {str(e)}")
+        return jsonify({'error': str(e)})
+
+@bp.route('/api/location')
+def api_location():
+    """API endpoint for location search suggestions"""
+    query = request.args.get('q', '')
+    if len(query) < 2:
+        return jsonify([])
+    
+    try:
+        locations = get_location_data(query)
+        return jsonify(locations)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Location API Error: {str(e)}")
+        return jsonify({'error': str(e)})
+
+@bp.route('/toggle-units')
+def toggle_units():
+    """Toggle between metric and imperial units"""
+    current_units = session.get('units', DEFAULT_UNITS)
+    new_units = 'imperial' if current_units == 'metric' else 'metric'
+    session['units'] = new_units
+    
+    # Redirect back to the main page with the new units
+    return redirect(url_for('main.index'))
+
+@bp.app_errorhandler(404)
+def page_not_found(e):
+    """Handle 404 errors"""
+    return render_template('error.html', error="Page not found"), 404
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """User registration"""
+    if current_user.is_authenticated:
+        return redirect(url_for('main.index'))
+        
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        
+        retry_after = login_throttle.allow(register=request.remote_addr)
+        if retry_after:
+            auth_logger.warning("Registration throttled for %s", request.remote_addr,
+                                extra={'event': 'auth.throttled', 'fields': {'ip': request.remote_addr}})
+            flash(f'Too many attempts. Please try again in {int(retry_after) + 1} seconds.', 'danger')
+            return render_template('register.html'), 429
+        
+        # Validate form data
+        if not username or not email or not password or not confirm_password:
+            flash('All fields are required', 'danger')
+            return render_template('register.html')
+            
+        if password != confirm_password:
+            flash('Passwords do not match', 'danger')
+            return render_template('register.html')
+            
+        if User.query.filter_by(username=username).first():
+            flash('Username already exists', 'danger')
+            return render_template('register.html')
+            
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered', 'danger')
+            return render_template('register.html')
+            
+        # Create new user
+        new_user = User()
+        new_user.username = username
+        new_user.email = email
+        try:
+            new_user.password_hash = password_hasher.hash(password)
+        except HashingBusy:
+            auth_logger.warning("Password hashing pool busy", extra={'event': 'auth.hash_busy'})
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('register.html'), 503
+        
+        try:
+            db.session.add(new_user)
+            db.session.commit()
+            flash('Registration successful! You can now log in.', 'success')
+            return redirect(url_for('main.login'))
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error registering user: {str(e)}")
+            flash('An error occurred during registration', 'danger')
+    
+    return render_template('register.html')
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """User login"""
+    if current_user.is_authenticated:
+        return redirect(url_for('main.index'))
+        
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        remember = request.form.get('remember') == 'on'
+        
+        # Throttle before doing any hashing work
+        retry_after = login_throttle.allow(ip=request.remote_addr, username=username)
+        if retry_after:
+            auth_logger.warning("Login throttled for %s from %s", username, request.remote_addr,
+                                extra={'event': 'auth.throttled', 'fields': {'ip': request.remote_addr, 'username': username}})
+            flash(f'Too many login attempts. Please try again in {int(retry_after) + 1} seconds.', 'danger')
+            return render_template('login.html'), 429
+        
+        user = User.query.filter_by(username=username).first()
+        
+        try:
+            valid = bool(user) and password_hasher.verify(user.password_hash, password)
+        except HashingBusy:
+            auth_logger.warning("Password hashing pool busy", extra={'event': 'auth.hash_busy'})
+            flash('The server is busy. Please try again in a moment.', 'warning')
+            return render_template('login.html'), 503
+        
+        if valid:
+            login_user(user, remember=remember)
+            
+            # Store the user's unit preference in the session
+            session['units'] = user.default_units
+            
+            next_page = request.args.get('next')
+            if next_page:
+                return redirect(next_page)
+            return redirect(url_for('main.index'))
+        else:
+            flash('Invalid username or password', 'danger')
+    
+    return render_template('login.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    """User logout"""
+    logout_user()
+    return redirect(url_for('main.index'))
+
+@bp.route('/profile')
+@login_required
+def profile():
+    """User profile page"""
+    # Get user's favorite locations
+    favorites = FavoriteLocation.query.filter_by(user_id=current_user.id).order_by(FavoriteLocation.added_at.desc()).all()
+    
+    return render_template('profile.html', favorites=favorites)
+
+@bp.route('/favorites/add', methods=['POST'])
+@login_required
+def add_favorite():
+    """Add a location to favorites"""
+    location_name = request.form.get('location_name')
+    latitude = request.form.get('latitude')
+    longitude = request.form.get('longitude')
+    
+    if not location_name:
+        flash('Location name is required', 'danger')
+        return redirect(url_for('main.index'))
+    
+    # Check if already in favorites
+    existing = FavoriteLocation.query.filter_by(
+        user_id=current_user.id,
+        location_name=location_name
+    ).first()
+    
+    if existing:
+        flash(f'{location_name} is already in your favorites', 'info')
+        return redirect(url_for('main.index'))
+    
+    # Add to favorites
+    try:
+        favorite = FavoriteLocation()
+        favorite.user_id = current_user.id
+        favorite.location_name = location_name
+        favorite.latitude = float(latitude) if latitude else None
+        favorite.longitude = float(longitude) if longitude else None
+        
+        # Resolve coordinates now so links to this favorite skip geocoding
+        if favorite.latitude is None or favorite.longitude is None:
+            try:
+                coords = get_coordinates(location_name)
+            except DeadlineExceeded:
+                coords = None  # saved without; `flask backfill-coordinates` fills it in later
+            if coords:
+                favorite.latitude, favorite.longitude = coords
+        
+        db.session.add(favorite)
+        db.session.commit()
+        flash(f'{location_name} added to favorites', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error adding favorite: {str(e)}")
+        flash('An error occurred while adding to favorites', 'danger')
+    
+    return redirect(url_for('main.index'))
+
+@bp.route('/favorites/remove/<int:favorite_id>', methods=['POST'])
+@login_required
+def remove_favorite(favorite_id):
+    """Remove a location from favorites"""
+    favorite = FavoriteLocation.query.get_or_404(favorite_id)
+    
+    # Check if the favorite belongs to the current user
+    if favorite.user_id != current_user.id:
+        flash('Unauthorized action', 'danger')
+        return redirect(url_for('main.profile'))
+    
+    try:
+        location_name = favorite.location_name
+        db.session.delete(favorite)
+        db.session.commit()
+        flash(f'{location_name} removed from favorites', 'success')
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error removing favorite: {str(e)}")
+        flash('An error occurred while removing from favorites', 'danger')
+    
+    return redirect(url_for('main.profile'))
+
+@bp.route('/settings', methods=['GET', 'POST'])
+@login_required
+def settings():
+    """User settings page"""
+    if request.method == 'POST':
+        default_units = request.form.get('default_units')
+        
+        if default_units not in ['metric', 'imperial']:
+            flash('Invalid units selection', 'danger')
+            return redirect(url_for('main.settings'))
+        
+        try:
+            current_user.default_units = default_units
+            db.session.commit()
+            session['units'] = default_units
+            flash('Settings updated successfully', 'success')
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error updating settings: {str(e)}")
+            flash('An error occurred while updating settings', 'danger')
+    
+    return render_template('settings.html')
+
+@bp.app_errorhandler(500)
+def server_error(e):
+    """Handle 500 errors"""
+    return render_template('error.html', error="Internal server error"), 500
@@ -1,13 +1,19 @@
 import os
+import time
 import requests
 import logging
 from urllib.parse import quote
-from cache import cache_data, get_cached_data
+from cache import cache_data, get_cached_data, get_expiry, begin_load, end_load
+from deadline import DeadlineExceeded
+from records import Coordinates, CurrentWeather, DailyForecast, Forecast, ForecastSeries
+from spatial import GridIndex
+from providers import get_provider
+from series import columnar_series
+
+logger = logging.getLogger('weather.api')
 
 # OpenWeatherMap API key from environment
 API_KEY = os.environ.get("OPENWEATHER_API_KEY", "")
-BASE_URL = "https://api.openweathermap.org/data/2.5"
-GEO_URL = "https://api.openweathermap.org/geo/1.0/direct"
 
 # Cache expiration time (in seconds)
 CACHE_EXPIRY = {
@@ -16,6 +22,75 @@ CACHE_EXPIRY = {
     'location': 24 * 60 * 60  # 24 hours
 }
 
+# Spatial reuse: a request within radius_km of a cached reading that is at
+# most max_age seconds old is served from that reading (radius 0 disables)
+SPATIAL_TOLERANCE = {
+    'current': {'radius_km': 1.0, 'max_age': 10 * 60},  # 1 km, 10 minutes
+    'forecast': {'radius_km': 10.0, 'max_age': 30 * 60}  # 10 km, 30 minutes
+}
+
+# One grid index per (data type, units)
+_spatial_indexes = {}
+
+# Seconds between sweeps that drop index points whose cache entry has expired
+SPATIAL_PRUNE_INTERVAL = 5 * 60
+_last_prune = {}
+
+# Callables notified after every upstream call as listener(endpoint, seconds)
+upstream_listeners = []
+
+def _fetch(endpoint, params):
+    """Fetch from the active provider, logging the call and its duration"""
+    start = time.perf_counter()
+    try:
+        return get_provider().fetch(endpoint, params)
+    finally:
+        elapsed = time.perf_counter() - start
+        for listener in upstream_listeners:
+            listener(endpoint, elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Upstream %s call took %.1f ms", endpoint, elapsed * 1000,
+                         extra={'event': 'upstream.fetch', 'fields': {'endpoint': endpoint, 'ms': round(elapsed * 1000, 1)}})
+
+def _find_nearby(data_type, lat, lon, units):
+    """
+    Look up a cached reading close enough to reuse
+    
+    Args:
+        data_type (str): 'current' or 'forecast'
+        lat, lon (float): Requested coordinates
+        units (str): 'metric' or 'imperial'
+        
+    Returns:
+        tuple: (cached record, age in seconds) or None
+    """
+    tolerance = SPATIAL_TOLERANCE.get(data_type)
+    index = _spatial_indexes.get((data_type, units))
+    if not tolerance or not tolerance['radius_km'] or index is None:
+        return None
+    
+    for _, key, plat, plon, stored_at in index.nearby(lat, lon, tolerance['radius_km'], tolerance['max_age']):
+        cached_data = get_cached_data(key)
+        if cached_data is None:
+            # The cache entry expired or was cleared
+            index.remove(plat, plon, key)
+            continue
+        return cached_data, time.time() - stored_at
+    return None
+
+def _index_location(data_type, lat, lon, units, cache_key):
+    """Register a freshly cached reading in the spatial index"""
+    index = _spatial_indexes.get((data_type, units))
+    if index is None:
+        index = _spatial_indexes.setdefault((data_type, units), GridIndex())
+    now = time.time()
+    index.insert(lat, lon, cache_key, now)
+    
+    # Points nobody queries near again would otherwise stay forever
+    if now - _last_prune.get((data_type, units), 0) >= SPATIAL_PRUNE_INTERVAL:
+        _last_prune[(data_type, units)] = now
+        index.prune(CACHE_EXPIRY[data_type], now)
+
 def get_current_weather(location, units="metric"):
     """
     Get current weather data for a location
@@ -31,7 +106,14 @@ def get_current_weather(location, units="metric"):
     cache_key = f"current_weather_{location}_{units}"
     cached_data = get_cached_data(cache_key)
     if cached_data:
-        return cached_data
+        return cached_data.to_dict()
+    
+    # If another request is already fetching this key, wait for it instead
+    leader = begin_load(cache_key)
+    if not leader:
+        cached_data = get_cached_data(cache_key)
+        if cached_data:
+            return cached_data.to_dict()
     
     try:
         # First get coordinates if location is a string (city name)
@@ -43,6 +125,13 @@ def get_current_weather(location, units="metric"):
         else:
             lat, lon = location
         
+        # Reuse a recent reading for a nearby point if there is one
+        nearby = _find_nearby('current', lat, lon, units)
+        if nearby:
+            weather, age = nearby
+            cache_data(cache_key, weather, max(CACHE_EXPIRY['current'] - age, 1))
+            return weather.to_dict()
+        
         # Make API request
         params = {
             'lat': lat,
@@ -50,41 +139,27 @@ def get_current_weather(location, units="metric"):
             'units': units,
             'appid': API_KEY
         }
-        response = requests.get(f"{BASE_URL}/weather", params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch('weather', params)
         
         # Format the data for our needs
-        weather_data = {
-            'location': data.get('name', location),
-            'country': data.get('sys', {}).get('country', ''),
-            'temperature': round(data.get('main', {}).get('temp', 0)),
-            'feels_like': round(data.get('main', {}).get('feels_like', 0)),
-            'humidity': data.get('main', {}).get('humidity', 0),
-            'pressure': data.get('main', {}).get('pressure', 0),
-            'wind_speed': data.get('wind', {}).get('speed', 0),
-            'wind_direction': data.get('wind', {}).get('deg', 0),
-            'description': data.get('weather', [{}])[0].get('description', ''),
-            'icon': data.get('weather', [{}])[0].get('icon', ''),
-            'main': data.get('weather', [{}])[0].get('main', ''),
-            'timestamp': data.get('dt', 0),
-            'sunrise': data.get('sys', {}).get('sunrise', 0),
-            'sunset': data.get('sys', {}).get('sunset', 0),
-            'latitude': data.get('coord', {}).get('lat', 0),
-            'longitude': data.get('coord', {}).get('lon', 0),
-            'units': units
-        }
+        weather = CurrentWeather.from_api(data, location, units)
         
         # Cache the data
-        cache_data(cache_key, weather_data, CACHE_EXPIRY['current'])
-        return weather_data
+        cache_data(cache_key, weather, CACHE_EXPIRY['current'])
+        _index_location('current', lat, lon, units, cache_key)
+        return weather.to_dict()
         
+    except DeadlineExceeded:
+        raise
     except requests.exceptions.RequestException as e:
-        logging.error(f"API error in get_current_weather: {str(e)}")
+        logger.error("API error in get_current_weather: %s", e)
         return {'error': f"Weather API error: {str(e)}"}
     except Exception as e:
-        logging.error(f"Error in get_current_weather: {str(e)}")
+        logger.error("Error in get_current_weather: %s", e)
         return {'error': f"An unexpected error occurred: {str(e)}"}
+    finally:
+        if leader:
+            end_load(cache_key)
 
 def get_forecast(location, units="metric"):
     """
@@ -97,12 +172,52 @@ def get_forecast(location, units="metric"):
     Returns:
         list: List of forecast data for each day
     """
+    forecast = _get_forecast_record(location, units)
+    if isinstance(forecast, dict):
+        return forecast
+    return [day.to_dict() for day in forecast.days]
+
+def get_forecast_series(location, units="metric", step=None, points=None):
+    """
+    Get the raw 3-hour forecast as parallel arrays, for charts
+    
+    Served from the same cache entry as get_forecast(), so it never costs
+    an extra upstream call.
+    
+    Args:
+        location (str): City name or coordinates
+        units (str): 'metric' for Celsius, 'imperial' for Fahrenheit
+        step (int): Optional resampling interval in seconds (linear interpolation)
+        points (int): Optional maximum number of points (bucket averages)
+        
+    Returns:
+        dict: {'units', 't', 'temperature', 'feels_like', 'humidity'}
+    """
+    forecast = _get_forecast_record(location, units)
+    if isinstance(forecast, dict):
+        return forecast
+    return columnar_series(forecast.series, units, step=step, points=points)
+
+def _get_forecast_record(location, units):
+    """
+    Get the cached Forecast record for a location, fetching it if needed
+    
+    Returns:
+        Forecast: Cached record, or an {'error': ...} dict
+    """
     # Check cache first
     cache_key = f"forecast_{location}_{units}"
     cached_data = get_cached_data(cache_key)
     if cached_data:
         return cached_data
     
+    # If another request is already fetching this key, wait for it instead
+    leader = begin_load(cache_key)
+    if not leader:
+        cached_data = get_cached_data(cache_key)
+        if cached_data:
+            return cached_data
+    
     try:
         # First get coordinates if location is a string (city name)
         if not isinstance(location, tuple):
@@ -113,6 +228,13 @@ def get_forecast(location, units="metric"):
         else:
             lat, lon = location
         
+        # Reuse a recent forecast for a nearby point if there is one
+        nearby = _find_nearby('forecast', lat, lon, units)
+        if nearby:
+            forecast, age = nearby
+            cache_data(cache_key, forecast, max(CACHE_EXPIRY['forecast'] - age, 1))
+            return forecast
+        
         # Make API request
         params = {
             'lat': lat,
@@ -120,9 +242,7 @@ def get_forecast(location, units="metric"):
             'units': units,
             'appid': API_KEY
         }
-        response = requests.get(f"{BASE_URL}/forecast", params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch('forecast', params)
         
         # Process the data to get daily forecasts (OpenWeatherMap returns 3-hour forecasts)
         forecasts = data.get('list', [])
@@ -164,28 +284,70 @@ def get_forecast(location, units="metric"):
             icon = max(set(icons), key=icons.count) if icons else ''
             description = max(set(descriptions), key=descriptions.count) if descriptions else ''
             
-            forecast_list.append({
-                'date': date,
-                'avg_temp': avg_temp,
-                'icon': icon,
-                'description': description,
-                'units': units
-            })
+            forecast_list.append(DailyForecast(date, avg_temp, icon, description, units))
         
         # Sort by date and limit to 5 days
-        forecast_list.sort(key=lambda x: x['date'])
-        forecast_list = forecast_list[:5]
+        forecast_list.sort(key=lambda x: x.date)
+        
+        # Keep the raw slots alongside the daily view for the series endpoint
+        forecast = Forecast(tuple(forecast_list[:5]), ForecastSeries.from_api(forecasts))
         
         # Cache the data
-        cache_data(cache_key, forecast_list, CACHE_EXPIRY['forecast'])
-        return forecast_list
+        cache_data(cache_key, forecast, CACHE_EXPIRY['forecast'])
+        _index_location('forecast', lat, lon, units, cache_key)
+        return forecast
         
+    except DeadlineExceeded:
+        raise
     except requests.exceptions.RequestException as e:
-        logging.error(f"API error in get_forecast: {str(e)}")
+        logger.error("API error in get_forecast: %s", e)
         return {'error': f"Weather API error: {str(e)}"}
     except Exception as e:
-        logging.error(f"Error in get_forecast: {str(e)}")
+        logger.error("Error in get_forecast: %s", e)
         return {'error': f"An unexpected error occurred: {str(e)}"}
+    finally:
+        if leader:
+            end_load(cache_key)
+
+def get_cached_weather(location, units="metric"):
+    """
+    Get current weather and forecast from the cache only, never calling upstream
+    
+    Used to answer shed requests cheaply under overload.
+    
+    Args:
+        location (str): City name or coordinates
+        units (str): 'metric' for Celsius, 'imperial' for Fahrenheit
+        
+    Returns:
+        tuple: (current weather dict, forecast list) or None if either is not cached
+    """
+    current = get_cached_data(f"current_weather_{location}_{units}")
+    forecast = get_cached_data(f"forecast_{location}_{units}")
+    if not current or not forecast:
+        return None
+    return current.to_dict(), [day.to_dict() for day in forecast.days]
+
+def seconds_until_refresh(location, units="metric"):
+    """
+    Seconds until the cached current weather or forecast for a location expires
+    
+    Args:
+        location (str): City name or coordinates
+        units (str): 'metric' for Celsius, 'imperial' for Fahrenheit
+        
+    Returns:
+        float: Seconds until the earliest expiry (0 if nothing is cached)
+    """
+    expiries = [
+        expiry for expiry in (
+            get_expiry(f"current_weather_{location}_{units}"),
+            get_expiry(f"forecast_{location}_{units}")
+        ) if expiry is not None
+    ]
+    if len(expiries) < 2:
+        return 0
+    return max(min(expiries) - time.time(), 0)
 
 def get_coordinates(location):
     """
@@ -210,9 +372,7 @@ def get_coordinates(location):
             'limit': 1,
             'appid': API_KEY
         }
-        response = requests.get(GEO_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch('geo', params)
         
         if not data or len(data) == 0:
             return None
@@ -223,17 +383,19 @@ def get_coordinates(location):
         if lat is None or lon is None:
             return None
             
-        coords = (lat, lon)
+        coords = Coordinates(lat, lon)
         
         # Cache the data
         cache_data(cache_key, coords, CACHE_EXPIRY['location'])
         return coords
         
+    except DeadlineExceeded:
+        raise
     except requests.exceptions.RequestException as e:
-        logging.error(f"API error in get_coordinates: {str(e)}")
+        logger.error("API error in get_coordinates: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Error in get_coordinates: {str(e)}")
+        logger.error("Error in get_coordinates: %s", e)
         return None
 
 def get_location_data(query):
@@ -259,9 +421,7 @@ def get_location_data(query):
             'limit': 5,
             'appid': API_KEY
         }
-        response = requests.get(GEO_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _fetch('geo', params)
         
         # Format the data
         locations = []
@@ -282,9 +442,11 @@ def get_location_data(query):
         cache_data(cache_key, locations, CACHE_EXPIRY['location'])
         return locations
         
+    except DeadlineExceeded:
+        raise
     except requests.exceptions.RequestException as e:
-        logging.error(f"API error in get_location_data: {str(e)}")
+        logger.error("API error in get_location_data: %s", e)
         return []
     except Exception as e:
-        logging.error(f"Error in get_location_data: {str(e)}")
+        logger.error("Error in get_location_data: %s", e)
         return []